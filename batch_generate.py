@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+"""
+测试用例批量生成命令行工具（无界面，不导入 PyQt5）
+
+示例：
+    python batch_generate.py requirements/ -o output/
+    python batch_generate.py "docs/*.md" -o output/ --service Kimi --concurrency 4
+    python batch_generate.py requirements/ -o output/ --formats excel jsonl csv
+    python batch_generate.py requirements/ -o output/ --service auto
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from generation_core import (TestCaseGenerator, SERVICE_CONFIG_KEYS, DEFAULT_CHUNK_MAX_TOKENS,
+                             DEFAULT_MAX_WORKERS, DEFAULT_MAX_CONTINUATIONS, build_hedge_config, service_config,
+                             route_request)
+from response_cache import ResponseCache
+import client_pool
+import generation_engine
+from case_export import extract_case_list, select_columns
+from case_sinks import (JsonlCaseSink, EXTENSIONS, DEFAULT_FORMATS, DEFAULT_BATCH_SIZE,
+                        DEFAULT_FSYNC_EVERY, DEFAULT_FSYNC_INTERVAL)
+from case_pipeline import finalize_cases
+from telemetry import metrics_log_path
+from model_router import AUTO_SERVICE
+from case_dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+from requirement_reader import read_requirement_file, REQUIREMENT_EXTENSIONS
+
+SUMMARY_FILENAME = "summary.json"
+
+
+def collect_inputs(patterns):
+    """将目录或通配符展开为需求文件列表（去重并保持顺序）"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.lower().endswith(REQUIREMENT_EXTENSIONS)
+            )
+        else:
+            matches = sorted(glob.glob(pattern))
+        for path in matches:
+            if os.path.isfile(path) and os.path.abspath(path) not in seen:
+                seen.add(os.path.abspath(path))
+                files.append(path)
+    return files
+
+
+def _output_name(path, level):
+    """level 为 0 时取文件名，之后依次加上扩展名与所在的上级目录"""
+    stem, extension = os.path.splitext(os.path.basename(path))
+    if level == 0:
+        return stem
+    name = f"{stem}_{extension.lstrip('.')}" if extension else stem
+    parents = [part for part in os.path.dirname(os.path.abspath(path)).split(os.sep) if part]
+    return "_".join((parents[len(parents) - level + 1:] if level > 1 else []) + [name])
+
+
+def output_names(files):
+    """每个需求文件对应的输出文件名（不含扩展名）
+
+    文件名相同（如 a.md 与 a.txt、不同目录下的同名文件）时依次加上扩展名与上级目录名，
+    直到互不相同，避免后处理的文件覆盖先处理的结果。
+    """
+    levels = dict.fromkeys(files, 0)
+    while True:
+        names = {path: _output_name(path, level) for path, level in levels.items()}
+        owners = {}
+        for path, name in names.items():
+            owners.setdefault(name.lower(), []).append(path)
+        conflicts = [path for paths in owners.values() if len(paths) > 1 for path in paths]
+        depth_left = [path for path in conflicts
+                      if _output_name(path, levels[path] + 1) != names[path]]
+        if not depth_left:
+            # 加上全部目录仍相同（极少见），按顺序追加序号
+            for paths in owners.values():
+                for number, path in enumerate(paths[1:], start=2):
+                    names[path] = f"{names[path]}_{number}"
+            return names
+        for path in depth_left:
+            levels[path] += 1
+
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="批量根据需求文件生成测试用例 Excel")
+    parser.add_argument("inputs", nargs="+", help="需求文件目录或通配符，如 docs/ 或 \"docs/*.md\"")
+    parser.add_argument("-o", "--output-dir", default="output", help="输出目录（默认 output）")
+    parser.add_argument("-c", "--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "config.json"),
+                        help="配置文件路径（默认与脚本同目录的 config.json）")
+    parser.add_argument("--service", default="DeepSeek", choices=list(SERVICE_CONFIG_KEYS) + [AUTO_SERVICE],
+                        help="AI 服务（默认 DeepSeek）")
+    parser.add_argument("--model", help="模型名称（默认取配置中该服务的 default_model）")
+    parser.add_argument("--api-key", help="API Key（默认读取环境变量 AI_TEST_API_KEY 或配置文件中所选服务的 api_key）")
+    parser.add_argument("--concurrency", type=int, default=2, help="同时处理的需求文件数（默认 2）")
+    parser.add_argument("--hedge", action="store_true", help="启用对冲请求（备用模型见配置 hedging 节）")
+    parser.add_argument("--no-cache", action="store_true", help="跳过响应缓存与需求章节历史，强制重新调用API")
+    parser.add_argument("--formats", nargs="+", choices=list(EXTENSIONS),
+                        help="输出格式，可多选（默认取配置中的 output.formats）")
+    return parser.parse_args(argv)
+
+
+def process_file(path, args, config, cache, name=None):
+    """生成单个需求文件的用例并导出，返回汇总信息；name 为输出文件名（不含扩展名），默认取需求文件名"""
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    output_path = os.path.join(args.output_dir, name + ".xlsx")
+    generation_config = config.get("generation", {})
+    output_config = config.get("output", {})
+    incremental_config = config.get("incremental", {})
+    started = time.monotonic()
+    formats = args.formats or output_config.get("formats", list(DEFAULT_FORMATS))
+    columns = select_columns(output_config.get("include_id", True), output_config.get("include_priority", True),
+                             output_config.get("include_precondition", True))
+    summary = {"input": path, "output": None, "cases": 0, "duplicates_removed": 0,
+               "status": "failed", "error": None}
+    live_sink = None
+
+    try:
+        document = read_requirement_file(path)
+        requirements = document.text
+        if args.service == AUTO_SERVICE:
+            # 每个需求文件按其规模单独选择模型
+            target, summary["routing"] = route_request(config, requirements, config["prompts"]["system_prompt"])
+            print(f"[{name}] 自动选择 {target['service']}/{target['model']}：{summary['routing']}")
+        else:
+            api_config = service_config(config, args.service)
+            target = {"service": args.service, "model": args.model or api_config["default_model"],
+                      "base_url": api_config["base_url"], "api_key": args.api_key}
+        summary["service"], summary["model"] = target["service"], target["model"]
+        if "jsonl" in formats:
+            live_sink = JsonlCaseSink(output_path, columns, live=True,
+                                      fsync_every=output_config.get("fsync_every", DEFAULT_FSYNC_EVERY),
+                                      fsync_interval=output_config.get("fsync_interval", DEFAULT_FSYNC_INTERVAL))
+
+        generator = TestCaseGenerator(
+            api_key=target["api_key"],
+            base_url=target["base_url"],
+            model=target["model"],
+            system_prompt=config["prompts"]["system_prompt"],
+            user_prompt=config["prompts"].get("user_prompt", ""),
+            requirements=requirements,
+            sections=document.sections,
+            service_type=target["service"],
+            chunk_max_tokens=generation_config.get("chunk_max_tokens", DEFAULT_CHUNK_MAX_TOKENS),
+            max_workers=generation_config.get("max_workers", DEFAULT_MAX_WORKERS),
+            hedge=(build_hedge_config(config, target["service"], target["model"], target["api_key"])
+                   if args.hedge else None),
+            cache=cache,
+            cache_bypass=args.no_cache,
+            rate_limits=config.get("rate_limits", {}),
+            retry=config.get("retry", {}),
+            output_limits=config.get("output_limits", {}),
+            adaptive_max_tokens=generation_config.get("adaptive_max_tokens", True),
+            max_continuations=generation_config.get("max_continuations", DEFAULT_MAX_CONTINUATIONS),
+            incremental=incremental_config if incremental_config.get("enabled", True) else None,
+            metrics_log=metrics_log_path(config.get("telemetry", {})),
+            on_case=live_sink.append if live_sink is not None else None,
+            on_progress=lambda message: print(f"[{name}] {message}"),
+        )
+        test_cases_list, _ = extract_case_list(generator.generate())
+        if live_sink is not None:
+            live_sink.close()
+        result = finalize_cases(
+            test_cases_list,
+            output_path,
+            formats=formats,
+            include_id=output_config.get("include_id", True),
+            include_priority=output_config.get("include_priority", True),
+            include_precondition=output_config.get("include_precondition", True),
+            split_by_module=output_config.get("split_by_module", False),
+            batch_size=output_config.get("batch_size", DEFAULT_BATCH_SIZE),
+            dedup_threshold=(output_config.get("dedup_threshold", DEFAULT_DEDUP_THRESHOLD)
+                             if output_config.get("dedup", True) else None),
+            validation_report=output_config.get("validation_report", True),
+        )
+        summary["outputs"] = result["outputs"]
+        summary["output"] = result["outputs"][0]
+        summary["duplicates_removed"] = result["removed"]
+        if result["report"]:
+            summary["invalid_cases"] = len(result["report"].issues)
+            if result["report_path"]:
+                summary["validation_report"] = result["report_path"]
+        summary["cases"] = len(result["cases"])
+        summary["failed_sections"] = generator.failed_sections
+        summary["status"] = "ok"
+        summary["metrics"] = generator.metrics.snapshot()
+    except Exception as e:
+        summary["error"] = str(e)
+        if live_sink is not None:
+            # 生成失败时保留已实时写入的用例
+            summary["output"] = live_sink.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 2)
+    return summary
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(args.config)
+    if args.service != AUTO_SERVICE:
+        # 配置文件中的 Key 从所选服务的配置节读取，api 节本身的 Key 只属于 DeepSeek
+        args.api_key = (args.api_key or os.environ.get("AI_TEST_API_KEY")
+                        or service_config(config, args.service).get("api_key", ""))
+        if not args.api_key:
+            print(f"未提供 {args.service} 的 API Key，请使用 --api-key、设置环境变量 AI_TEST_API_KEY，"
+                  f"或在配置文件中该服务的配置节填写 api_key")
+            return 2
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("没有找到需求文件")
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    client_pool.configure(config.get("network", {}))
+    generation_engine.configure(config.get("network", {}))
+    cache_config = config.get("cache", {})
+    cache = ResponseCache.from_config(cache_config) if cache_config.get("enabled", True) else None
+
+    print(f"共 {len(files)} 个需求文件，并发数 {args.concurrency}")
+    started = time.monotonic()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        names = output_names(files)
+        futures = {executor.submit(process_file, path, args, config, cache, names[path]): path for path in files}
+        for future in as_completed(futures):
+            summary = future.result()
+            results[futures[future]] = summary
+            if summary["status"] == "ok":
+                print(f"✅ {summary['input']} -> {summary['output']}（{summary['cases']} 个用例，{summary['seconds']} 秒）")
+                for failure in summary["failed_sections"]:
+                    print(f"   ⚠️ 第 {failure['section']} 部分（{failure['heading']}）生成失败，未包含在结果中: "
+                          f"{failure['error']}")
+            else:
+                print(f"❌ {summary['input']}: {summary['error']}")
+
+    summaries = [results[path] for path in files]
+    failed = sum(1 for summary in summaries if summary["status"] != "ok")
+    report = {
+        "service": args.service,
+        "model": (AUTO_SERVICE if args.service == AUTO_SERVICE
+                  else args.model or service_config(config, args.service)["default_model"]),
+        "files": len(files),
+        "failed": failed,
+        "incomplete": sum(1 for summary in summaries if summary.get("failed_sections")),
+        "cases": sum(summary["cases"] for summary in summaries),
+        "seconds": round(time.monotonic() - started, 2),
+        "results": summaries,
+    }
+    if cache is not None:
+        report["cache_hits"], report["cache_misses"] = cache.stats()
+
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILENAME)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    incomplete = f"（其中 {report['incomplete']} 个有需求部分生成失败）" if report["incomplete"] else ""
+    print(f"完成：成功 {len(files) - failed} 个{incomplete}，失败 {failed} 个，汇总见 {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
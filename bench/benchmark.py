@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+端到端性能基准
+
+启动本地模拟服务（bench/mock_server.py），用真实界面走完整流程：
+点击生成 → GenerationTask.run 流式接收与解析 → handleTestCases 导出 Excel，
+对不同的响应规模分别计时，结果写入 JSON 报告：
+
+    python bench/benchmark.py --sizes 10 100 1000 10000 100000 --report bench_report.json
+    python bench/benchmark.py --sizes 1000 --mode malformed --tokens-per-second 2000
+
+每项记录：首字延迟、流式接收与解析耗时、导出耗时、总耗时、解析/导出的用例数、响应字节数。
+基准在临时的用户目录中运行，不读写本机的响应缓存、章节历史与指标日志。
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+MODES = {
+    "normal": {},
+    "malformed": {"malformed_every": 10},
+    "truncated": {"truncate_at": 0.9},
+    "fenced": {"fence": True},
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="基于本地模拟服务的端到端性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="每次响应的用例数")
+    parser.add_argument("--mode", choices=list(MODES), default="normal", help="模拟服务的响应模式")
+    parser.add_argument("--ttft", type=float, default=0.0, help="模拟的首字延迟（秒）")
+    parser.add_argument("--chunk-chars", type=int, default=64, help="每个数据块的字符数")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="模拟的输出速度，0 表示不限速")
+    parser.add_argument("--timeout", type=float, default=600, help="单次生成的超时秒数")
+    parser.add_argument("--report", default="bench_report.json", help="报告输出路径")
+    return parser.parse_args(argv)
+
+
+def run_once(app, window, server, cases, timeout):
+    """执行一次完整的生成与导出，返回计时结果"""
+    from PyQt5.QtWidgets import QMessageBox
+
+    server.settings["cases"] = cases
+    marks = {"messages": []}
+
+    def record_message(kind):
+        def show(parent, title, text, *args):
+            marks.setdefault("dialog", time.monotonic())
+            marks["messages"].append({"kind": kind, "title": title, "text": text})
+        return staticmethod(show)
+
+    for kind in ("information", "warning", "critical"):
+        setattr(QMessageBox, kind, record_message(kind))
+
+    output_path = os.path.join(tempfile.mkdtemp(prefix="bench_"), f"cases_{cases}.xlsx")
+    window.output_path.setText(output_path)
+    window.requirements_input.setPlainText(f"用户登录与下单流程需求（基准 {cases} 条，{time.time()}）")
+
+    started = time.monotonic()
+    window.generateTestCases()
+    worker = window.worker
+
+    deadline = started + timeout
+    while "dialog" not in marks or worker.isRunning():
+        app.processEvents()
+        if time.monotonic() > deadline:
+            worker.generator.cancel()
+            return {"cases": cases, "status": "timeout"}
+        time.sleep(0.001)
+    finished = time.monotonic()
+    metrics = worker.generator.metrics.snapshot()
+    # 生成任务结束（流式接收与解析完成）的时刻，之后为界面线程中的去重与导出
+    stream_done = worker.generator.metrics.finished or finished
+
+    errors = [message for message in marks["messages"] if message["kind"] == "critical"]
+    result = {
+        "cases": cases,
+        "status": "failed" if errors else "ok",
+        "error": errors[0]["text"] if errors else None,
+        "ttft_seconds": metrics["ttft"],
+        "stream_seconds": round(stream_done - started, 3),
+        "export_seconds": round(finished - stream_done, 3),
+        "total_seconds": round(finished - started, 3),
+        "cases_parsed": metrics["cases"],
+        "response_bytes": metrics["bytes"],
+        "tokens_per_second": metrics["tokens_per_second"],
+    }
+    exported = [re.search(r'已生成 (\d+) 个测试用例', message["text"]) for message in marks["messages"]
+                if message["kind"] == "information"]
+    result["cases_exported"] = int(exported[0].group(1)) if exported and exported[0] else 0
+    if os.path.exists(output_path):
+        result["output_bytes"] = os.path.getsize(output_path)
+    result["cases_per_second"] = round(result["cases_parsed"] / result["total_seconds"], 1)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report_path = os.path.abspath(args.report)
+
+    # 隔离用户目录：响应缓存、章节历史、token 用量与指标日志都写到临时目录
+    home = tempfile.mkdtemp(prefix="bench_home_")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    from mock_server import MockServer
+    import deepseek_test_generator_gui_enhanced as gui
+
+    settings = dict(MODES[args.mode], ttft=args.ttft, chunk_chars=args.chunk_chars,
+                    tokens_per_second=args.tokens_per_second)
+    server = MockServer(**settings)
+    base_url = server.start()
+
+    app = QApplication.instance() or QApplication([])
+    os.chdir(ROOT)
+    window = gui.TestGeneratorGUI()
+    window.base_url_input.setText(base_url)
+    window.api_key_input.setText("mock-key")
+    window.cache_bypass_check.setChecked(True)
+    window.incremental_check.setChecked(False)
+    window.hedging_check.setChecked(False)
+
+    runs = []
+    try:
+        for cases in args.sizes:
+            result = run_once(app, window, server, cases, args.timeout)
+            runs.append(result)
+            if result["status"] == "ok":
+                print(f"✅ {cases} 个用例：首字 {result['ttft_seconds']}s，接收解析 {result['stream_seconds']}s，"
+                      f"导出 {result['export_seconds']}s，总计 {result['total_seconds']}s")
+            else:
+                print(f"❌ {cases} 个用例：{result['status']} {result.get('error') or ''}")
+    finally:
+        server.stop()
+
+    report = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": args.mode,
+        "server": {name: value for name, value in server.settings.items() if name != "cases"},
+        "runs": runs,
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"报告已写入 {report_path}")
+    return 0 if all(run["status"] == "ok" for run in runs) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
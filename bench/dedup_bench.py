@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+近似重复用例检测性能检查
+
+生成大量模板化的用例，并为其中一部分插入改写过措辞的近似副本，检查：
+- 去重耗时不超过预算
+- 插入的近似副本都被识别出来（每组只保留一条）
+
+任一项不满足时退出码为 1：
+    python bench/dedup_bench.py --cases 30000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from case_dedup import deduplicate, DEFAULT_THRESHOLD
+
+MODULES = "登录 注册 支付 订单 购物车 搜索 个人中心 设置 消息 收藏 评论 分享 退出 修改密码 绑定手机 地址 优惠券 发票 退款 客服".split()
+ACTIONS = "点击 输入 滑动 长按 选择 勾选 清空 上传 下载 刷新".split()
+
+
+def make_case(rng, index):
+    modules = rng.sample(MODULES, 3)
+    actions = rng.sample(ACTIONS, 3)
+    return {
+        "directory": modules[0],
+        "title": f"验证{modules[0]}{modules[1]}功能{index}",
+        "steps": [f"打开{modules[0]}页面", f"{actions[0]}{modules[1]}按钮{index % 97}",
+                  f"{actions[1]}{modules[2]}输入框并填写{index * 7}"],
+        "expected_result": f"{modules[2]}显示{actions[2]}成功，编号{index}",
+        "priority": f"P{index % 3}",
+    }
+
+
+def make_near_duplicate(case):
+    duplicate = dict(case)
+    duplicate["title"] = case["title"] + "。"
+    duplicate["steps"] = list(case["steps"]) + ["确认"]
+    return duplicate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查近似重复用例检测的耗时与召回")
+    parser.add_argument("--cases", type=int, default=30000, help="用例数（默认 30000）")
+    parser.add_argument("--duplicate-every", type=int, default=100, help="每隔多少条插入一条近似副本")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="相似度阈值")
+    parser.add_argument("--budget", type=float, default=10.0, help="耗时预算（秒，默认 10）")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1)
+    cases = [make_case(rng, index) for index in range(args.cases)]
+    duplicates = [make_near_duplicate(cases[index]) for index in range(0, args.cases, args.duplicate_every)]
+
+    started = time.perf_counter()
+    kept, removed = deduplicate(cases + duplicates, args.threshold)
+    elapsed = time.perf_counter() - started
+
+    ok = elapsed <= args.budget and removed >= len(duplicates)
+    print(f"{'✅' if ok else '❌'} {args.cases + len(duplicates)} 个用例，插入近似副本 {len(duplicates)} 个，"
+          f"移除 {removed} 个，保留 {len(kept)} 个，耗时 {elapsed:.2f} 秒（预算 {args.budget:.0f} 秒）")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
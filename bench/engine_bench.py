@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+生成引擎并发检查
+
+启动本地模拟服务，同时发起大量流式调用（模拟多分块、多文件并发），检查：
+- 所有调用都在同一个引擎线程中完成并解析出全部用例
+- 同时进行的流不超过全局并发上限 network.max_concurrent_streams
+- 客户端一侧的线程数不随并发流数增长（只有引擎线程与固定数量的域名解析线程）
+
+任一项不满足时退出码为 1：
+    python bench/engine_bench.py --streams 64 --max-concurrent 16
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockServer
+from streaming import StreamAttempt
+import client_pool
+import generation_engine
+
+
+def client_threads():
+    """客户端一侧的线程数（不含模拟服务处理请求的线程）"""
+    return sum(1 for thread in threading.enumerate() if "process_request" not in thread.name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查生成引擎的全局并发上限与线程占用")
+    parser.add_argument("--streams", type=int, default=64, help="同时发起的流式调用数（默认 64）")
+    parser.add_argument("--max-concurrent", type=int, default=16, help="全局并发上限（默认 16）")
+    parser.add_argument("--cases", type=int, default=20, help="每次调用返回的用例数（默认 20）")
+    parser.add_argument("--ttft", type=float, default=0.3, help="模拟的首字延迟（秒，默认 0.3）")
+    args = parser.parse_args(argv)
+
+    server = MockServer(cases=args.cases, ttft=args.ttft)
+    base_url = server.start()
+    engine = generation_engine.default_engine()
+    engine.configure({"max_concurrent_streams": args.max_concurrent})
+    client_pool.configure({"max_connections": args.max_concurrent, "max_keepalive_connections": args.max_concurrent})
+    client = client_pool.get_client(base_url, "bench")
+
+    threads_before = client_threads()
+    peak = {"streams": 0, "threads": 0}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            peak["streams"] = max(peak["streams"], engine.active_streams)
+            peak["threads"] = max(peak["threads"], client_threads())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    attempts = [StreamAttempt(client, {"model": "bench", "stream": True, "max_tokens": 100000,
+                                       "messages": [{"role": "user", "content": f"需求 {index}"}]})
+                for index in range(args.streams)]
+    for attempt in attempts:
+        attempt.start()
+    for attempt in attempts:
+        attempt.done.wait()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    server.stop()
+
+    parsed = sum(len(attempt.cases) for attempt in attempts)
+    errors = [attempt.error for attempt in attempts if attempt.error is not None]
+    # 采样线程本身占一个线程；引擎只有事件循环线程与固定数量的域名解析线程
+    extra_threads = peak["threads"] - threads_before - 1
+    ok = (not errors and parsed == args.streams * args.cases and peak["streams"] <= args.max_concurrent
+          and extra_threads <= 1 + generation_engine.RESOLVER_THREADS)
+    print(f"{'✅' if ok else '❌'} {args.streams} 路流式调用（全局上限 {args.max_concurrent}）：{elapsed:.2f} 秒，"
+          f"解析 {parsed}/{args.streams * args.cases} 个用例，失败 {len(errors)} 路，"
+          f"同时进行最多 {peak['streams']} 路，客户端新增线程 {extra_threads} 个")
+    if errors:
+        print(f"首个错误: {errors[0]}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+本地模拟的 OpenAI 兼容流式服务
+
+实现 POST /v1/chat/completions 的 SSE 流式响应，返回指定数量的测试用例 JSON 数组，
+用于在不消耗真实 token 的情况下测试和压测生成流程。可调参数：
+- cases：返回的用例数
+- ttft：首个数据块之前的等待秒数
+- chunk_chars：每个数据块包含的字符数
+- tokens_per_second：输出速度（按 4 字符/token 估算），0 表示不限速
+- malformed_every：每隔多少个用例插入一个损坏的 JSON 对象，0 表示不损坏
+- truncate_at：在响应的该比例处截断并以 finish_reason=length 结束，0 表示不截断
+- honor_max_tokens：响应超过请求的 max_tokens（按 4 字符/token 估算）时截断并以 finish_reason=length 结束；
+  续写请求（带有 assistant 消息）从其中最后一个用例之后继续输出
+- fence：用 ```json 代码块包裹响应
+- fail_first / fail_status：前若干次请求直接返回该 HTTP 状态码（附带 Retry-After: 1）
+
+单独运行，供界面或命令行工具连接（Base URL 填 http://127.0.0.1:8765/v1）：
+    python bench/mock_server.py --port 8765 --cases 50 --ttft 1.5 --tokens-per-second 80
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SETTINGS = {
+    "cases": 50,
+    "ttft": 0.0,
+    "chunk_chars": 64,
+    "tokens_per_second": 0,
+    "malformed_every": 0,
+    "truncate_at": 0.0,
+    "honor_max_tokens": False,
+    "fence": False,
+    "fail_first": 0,
+    "fail_status": 429,
+}
+
+MODULES = ("登录", "注册", "支付", "订单", "购物车", "搜索", "个人中心", "设置", "消息", "收藏")
+TARGETS = ("手机号输入框", "验证码输入框", "密码输入框", "【提交】按钮", "【取消】按钮", "商品列表", "地址选择器",
+           "优惠券入口", "头像上传控件", "分页控件", "筛选下拉框", "搜索框", "消息通知开关", "二维码扫描入口")
+ACTIONS = ("点击", "长按", "输入合法值到", "输入超长字符串到", "清空", "快速连续点击", "上滑刷新", "切换横屏后操作",
+           "断网后点击", "输入特殊字符到")
+RESULTS = ("提示“操作成功”", "弹出错误提示并保持当前页面", "数据同步至后台数据库", "跳转至首页", "按钮置灰不可点击",
+           "列表按时间倒序刷新", "显示加载动画后展示结果", "提示“网络异常，请重试”", "输入框下方显示红色校验文案")
+
+
+def make_case(index):
+    """按下标生成确定的、内容各不相同的模拟用例"""
+    rng = random.Random(index)
+    module = MODULES[index % len(MODULES)]
+    steps = [f"打开应用并进入{module}页面"]
+    steps += [f"{rng.choice(ACTIONS)}{rng.choice(TARGETS)}" for _ in range(rng.randint(2, 5))]
+    return {
+        "directory": module,
+        "title": f"{module}-{rng.choice(ACTIONS)}{rng.choice(TARGETS)}后{rng.choice(RESULTS)}（场景{index}）",
+        "steps": steps,
+        "expected_result": "；".join(rng.sample(RESULTS, 2)),
+        "priority": f"P{index % 3}",
+    }
+
+
+def build_response(settings, start=0):
+    """按设置生成完整的响应文本，start 为续写时的起始用例下标"""
+    objects = []
+    for index in range(start, settings["cases"]):
+        text = json.dumps(make_case(index), ensure_ascii=False)
+        if settings["malformed_every"] and (index + 1) % settings["malformed_every"] == 0:
+            # 去掉标题值的左引号，使该对象无法解析
+            text = text.replace('"title": "', '"title": ', 1)
+        objects.append(text)
+    body = "[" + ",\n".join(objects) + "]"
+    if settings["fence"]:
+        body = "```json\n" + body + "\n```"
+    return body
+
+
+def continuation_start(messages):
+    """续写请求中 assistant 消息里最后一个用例的下一个下标，非续写请求返回 0"""
+    for message in reversed(messages):
+        if message.get("role") == "assistant":
+            indexes = re.findall(r"（场景(\d+)）", message.get("content") or "")
+            return int(indexes[-1]) + 1 if indexes else 0
+    return 0
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        settings = dict(server.settings)
+
+        with server.lock:
+            server.requests += 1
+            request_number = server.requests
+        if request_number <= settings["fail_first"]:
+            payload = json.dumps({"error": {"message": "mock failure", "type": "rate_limit_error"}}).encode()
+            self.send_response(settings["fail_status"])
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        model = request.get("model", "mock")
+        start = 0
+        if settings["honor_max_tokens"]:
+            start = continuation_start(request.get("messages", []))
+        body = build_response(settings, start)
+        finish_reason = "stop"
+        if settings["truncate_at"]:
+            body = body[:int(len(body) * settings["truncate_at"])]
+            finish_reason = "length"
+        if settings["honor_max_tokens"] and len(body) > request.get("max_tokens", 0) * 4:
+            body = body[:request.get("max_tokens", 0) * 4]
+            finish_reason = "length"
+
+        try:
+            time.sleep(settings["ttft"])
+            self._send_chunk(model, {"role": "assistant", "content": ""})
+            step = max(1, settings["chunk_chars"])
+            rate = settings["tokens_per_second"]
+            started = time.monotonic()
+            for offset in range(0, len(body), step):
+                self._send_chunk(model, {"content": body[offset:offset + step]})
+                if rate:
+                    # 按累计输出量控制速度，避免逐块 sleep 的误差累积
+                    delay = (offset + step) / 4 / rate - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+            self._send_chunk(model, {}, finish_reason, usage={"completion_tokens": len(body) // 4})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端取消（如对冲请求的落败一路）
+            pass
+
+    def _send_chunk(self, model, delta, finish_reason=None, usage=None):
+        chunk = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if usage is not None:
+            chunk["usage"] = usage
+        self.wfile.write(b"data: " + json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n\n")
+
+
+class MockServer:
+    """在后台线程中运行的模拟服务，settings 可在两次请求之间修改"""
+
+    def __init__(self, host="127.0.0.1", port=0, **settings):
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.settings = dict(DEFAULT_SETTINGS, **settings)
+        self.httpd.requests = 0
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def settings(self):
+        return self.httpd.settings
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地模拟的 OpenAI 兼容流式服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cases", type=int, default=DEFAULT_SETTINGS["cases"])
+    parser.add_argument("--ttft", type=float, default=DEFAULT_SETTINGS["ttft"])
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_SETTINGS["chunk_chars"])
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_SETTINGS["tokens_per_second"])
+    parser.add_argument("--malformed-every", type=int, default=DEFAULT_SETTINGS["malformed_every"])
+    parser.add_argument("--truncate-at", type=float, default=DEFAULT_SETTINGS["truncate_at"])
+    parser.add_argument("--honor-max-tokens", action="store_true")
+    parser.add_argument("--fence", action="store_true")
+    parser.add_argument("--fail-first", type=int, default=DEFAULT_SETTINGS["fail_first"])
+    parser.add_argument("--fail-status", type=int, default=DEFAULT_SETTINGS["fail_status"])
+    args = parser.parse_args(argv)
+
+    settings = {name: value for name, value in vars(args).items() if name in DEFAULT_SETTINGS}
+    server = MockServer(args.host, args.port, **settings)
+    print(f"模拟服务已启动: {server.base_url}（Ctrl+C 退出）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
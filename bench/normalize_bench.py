@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+用例规范化与校验性能检查
+
+生成大量用例，并按比例混入各类格式问题（缺少字段、步骤为空、优先级写法不一、
+步骤自带序号、非对象条目），检查：
+- 规范化与校验耗时不超过预算
+- 每个注入的问题都出现在校验报告中，规范化后的优先级只有 P0/P1/P2
+
+任一项不满足时退出码为 1：
+    python bench/normalize_bench.py --cases 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from case_schema import normalize_cases, PRIORITIES
+from case_export import case_to_row
+
+PRIORITY_SPELLINGS = ("P0", "p1", "P2", "高", "中", "低", "1", 2, "P1级", "High")
+
+
+def make_case(rng, index):
+    return {
+        "directory": f"模块{index % 40}",
+        "title": f"验证功能{index}的第{rng.randint(1, 9)}种场景",
+        "steps": [f"{i}. 执行操作{index}-{i}" if index % 2 else f"执行操作{index}-{i}" for i in range(1, rng.randint(2, 6))],
+        "expected_result": f"结果{index}符合预期",
+        "priority": PRIORITY_SPELLINGS[index % len(PRIORITY_SPELLINGS)],
+    }
+
+
+def corrupt(rng, cases, every):
+    """每隔 every 个用例注入一种格式问题，返回被注入问题的下标"""
+    corrupted = []
+    for index in range(0, len(cases), every):
+        kind = (index // every) % 5
+        if kind == 0:
+            del cases[index]["priority"]
+        elif kind == 1:
+            cases[index]["steps"] = []
+        elif kind == 2:
+            cases[index]["priority"] = "紧急程度未知"
+        elif kind == 3:
+            cases[index]["steps"] = "1. 第一步\n2. 第二步"
+            del cases[index]["expected_result"]
+        else:
+            cases[index] = f"无效条目{index}"
+        corrupted.append(index)
+    return corrupted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查用例规范化与校验的耗时")
+    parser.add_argument("--cases", type=int, default=100000, help="用例数（默认 100000）")
+    parser.add_argument("--corrupt-every", type=int, default=50, help="每隔多少个用例注入一个格式问题")
+    parser.add_argument("--budget", type=float, default=5.0, help="耗时预算（秒，默认 5）")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1)
+    cases = [make_case(rng, index) for index in range(args.cases)]
+    corrupted = corrupt(rng, cases, args.corrupt_every)
+
+    started = time.perf_counter()
+    normalized, report = normalize_cases(cases)
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for index, case in enumerate(normalized, 1):
+        case_to_row(index, case)
+    row_seconds = time.perf_counter() - started
+
+    reported = {issue["index"] - 1 for issue in report.issues}
+    missed = [index for index in corrupted if index not in reported]
+    priorities = {case["priority"] for case in normalized}
+    ok = elapsed <= args.budget and not missed and priorities <= set(PRIORITIES)
+    print(f"{'✅' if ok else '❌'} {args.cases} 个用例，注入问题 {len(corrupted)} 个，报告 {len(report.issues)} 个"
+          f"（丢弃 {report.dropped} 个，漏报 {len(missed)} 个），优先级 {sorted(priorities)}；"
+          f"规范化与校验 {elapsed:.2f} 秒（预算 {args.budget:.0f} 秒），转换为导出行 {row_seconds:.2f} 秒")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+结果表格响应性检查
+
+在离屏 QTableView 中按批追加大量用例（模拟生成过程中定时器的批量刷新），检查：
+- 每批追加并重绘的耗时不超过预算，界面不会卡顿
+- 按列排序、按模块与优先级筛选的耗时不超过预算
+- 筛选后 visibleCases() 只包含符合条件的用例
+
+任一项不满足时退出码为 1：
+    QT_QPA_PLATFORM=offscreen python bench/results_table_bench.py --cases 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QTableView
+
+from results_model import CaseTableModel
+
+PRIORITIES = ("P0", "P1", "P2", "高", "中")
+
+
+def make_case(index):
+    return {
+        "directory": f"模块{index % 40}",
+        "title": f"验证功能{index}的场景",
+        "steps": [f"执行操作{index}-{step}" for step in range(1, 4)],
+        "expected_result": f"结果{index}符合预期",
+        "priority": PRIORITIES[index % len(PRIORITIES)],
+    }
+
+
+def timed(app, action):
+    started = time.perf_counter()
+    action()
+    app.processEvents()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查结果表格在大量用例下的响应性")
+    parser.add_argument("--cases", type=int, default=50000, help="用例数（默认 50000）")
+    parser.add_argument("--batch", type=int, default=1000, help="每批追加的用例数（默认 1000）")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="单次操作耗时预算（毫秒，默认 100）")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    model = CaseTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.setSortingEnabled(True)
+    view.resize(1000, 700)
+    view.show()
+    app.processEvents()
+
+    cases = [make_case(index) for index in range(args.cases)]
+    batch_times = [timed(app, lambda start=start: model.appendCases(cases[start:start + args.batch]))
+                   for start in range(0, len(cases), args.batch)]
+    operations = {
+        "按标题排序": timed(app, lambda: view.sortByColumn(2, Qt.AscendingOrder)),
+        "排序状态下追加": timed(app, lambda: model.appendCases(cases[:args.batch])),
+        "按模块筛选": timed(app, lambda: model.setFilter(module="模块3")),
+        "按模块与优先级筛选": timed(app, lambda: model.setFilter(module="模块3", priority="P0")),
+        "取消筛选": timed(app, lambda: model.setFilter()),
+    }
+    model.setFilter(module="模块3", priority="P0")
+    visible = model.visibleCases()
+    filter_ok = bool(visible) and all(case["directory"] == "模块3" and case["priority"] in ("P0", "高")
+                                      for case in visible)
+
+    worst = max(batch_times + list(operations.values())) * 1000
+    ok = worst <= args.budget_ms and filter_ok and model.totalCount() == args.cases + args.batch
+    print(f"{'✅' if ok else '❌'} {args.cases} 个用例，每批 {args.batch} 个：追加最慢 {max(batch_times) * 1000:.0f} ms，"
+          f"共 {sum(batch_times):.2f} 秒；"
+          + "，".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in operations.items())
+          + f"；筛选结果 {len(visible)} 个{'正确' if filter_ok else '有误'}（预算 {args.budget_ms:.0f} ms）")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+启动耗时预算检查
+
+在全新的解释器中执行各入口的冷启动代码（导入模块并创建窗口），检查：
+- 启动耗时（取多次运行的中位数）不超过预算
+- 启动过程中没有提前导入 openpyxl / openai 等重量级依赖，命令行工具没有导入 PyQt5
+
+任一项不满足时退出码为 1，可直接放在 CI 中运行：
+    python bench/startup_budget.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_GUI_SNIPPET = """
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+import {module} as entry
+window = entry.{window}()
+"""
+
+# 入口 -> (冷启动代码, 默认预算毫秒, 不允许在启动阶段加载的模块)
+ENTRY_POINTS = {
+    "main_launcher": (
+        _GUI_SNIPPET.format(module="main_launcher", window="LauncherGUI"),
+        800, ("openpyxl", "openai", "deepseek_test_generator_gui_enhanced"),
+    ),
+    "deepseek_test_generator_gui_enhanced": (
+        _GUI_SNIPPET.format(module="deepseek_test_generator_gui_enhanced", window="TestGeneratorGUI"),
+        1200, ("openpyxl", "openai"),
+    ),
+    "batch_generate": (
+        "import batch_generate",
+        300, ("PyQt5", "openpyxl", "openai"),
+    ),
+}
+
+_RUNNER = """
+import sys, time, json
+started = time.perf_counter()
+exec(compile(sys.argv[1], "<startup>", "exec"))
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({"ms": elapsed, "modules": sorted({name.split(".")[0] for name in sys.modules})}))
+"""
+
+
+def measure_startup(code):
+    """在子进程中执行冷启动代码，返回 (耗时毫秒, 已加载的顶层模块名集合)"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run(
+        [sys.executable, "-c", _RUNNER, code],
+        cwd=ROOT, capture_output=True, text=True, encoding='utf-8', env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"启动失败:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["ms"], set(report["modules"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查各入口的冷启动耗时预算")
+    parser.add_argument("--runs", type=int, default=5, help="每个模块的测量次数（默认 5）")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍数，较慢的机器上可适当放宽")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, (code, budget_ms, forbidden) in ENTRY_POINTS.items():
+        timings = []
+        loaded = set()
+        for _ in range(max(1, args.runs)):
+            elapsed_ms, loaded = measure_startup(code)
+            timings.append(elapsed_ms)
+        median_ms = statistics.median(timings)
+        limit_ms = budget_ms * args.scale
+        eager = sorted(module for module in forbidden if module in loaded)
+
+        ok = median_ms <= limit_ms and not eager
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} {name}: {median_ms:.0f} ms（预算 {limit_ms:.0f} ms）")
+        if eager:
+            print(f"   启动阶段加载了不应加载的模块: {', '.join(eager)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""近似重复用例检测
+
+对每个用例的标题、步骤与预期结果计算 MinHash 签名，按 LSH 分段建立索引，只对落入同一
+桶的候选对计算精确的 Jaccard 相似度，避免两两比较。相似度达到阈值的用例归为一组，
+每组只保留优先级最高的一个（同优先级保留先出现的）。
+"""
+import re
+from hashlib import blake2b
+from itertools import combinations
+
+DEFAULT_THRESHOLD = 0.85
+# 字符 n-gram 长度；模板化的用例大量共用二元组（如“点击”“按钮”），三元组的候选对少得多
+SHINGLE_SIZE = 3
+# 签名长度（分桶数）及 LSH 分段时要求的召回率
+SIGNATURE_SIZE = 40
+TARGET_RECALL = 0.99
+# 单个桶内候选过多时，超出的用例只与桶内第一个用例比较，防止退化为平方复杂度
+MAX_BUCKET_SIZE = 200
+
+_MASK = (1 << 64) - 1
+_EMPTY = _MASK + 1
+_NOISE = re.compile(r'[\W_]+')
+_PRIORITY_RANK = {"P0": 0, "P1": 1, "P2": 2}
+
+
+def _case_text(case):
+    parts = []
+    for field in ("title", "steps", "expected_result"):
+        value = case.get(field, "")
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(item) for item in value)
+        else:
+            parts.append(str(value))
+    # 去掉空白与标点，只比较文字内容
+    return _NOISE.sub("", "".join(parts).lower())
+
+
+def shingles(case):
+    """返回用例文本的字符 n-gram 集合"""
+    return _text_shingles(_case_text(case))
+
+
+def _text_shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _stable_hash(shingle):
+    """64 位哈希；不用内置 hash()，其字符串哈希按进程加盐，同样的用例在不同进程中会得到不同的签名"""
+    return int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(shingle_set, hashes=None):
+    """单次哈希的分桶 MinHash（one permutation hashing）
+
+    每个 n-gram 只计算一次哈希，按哈希值落入 SIGNATURE_SIZE 个桶并保留桶内最小值；
+    空桶借用右侧最近的非空桶（循环）的值并加上偏移，使短文本的签名仍可比较。
+    hashes 为可选的 n-gram → 哈希值缓存，批量计算时各用例共用的 n-gram 只哈希一次。
+    """
+    if hashes is None:
+        values = map(_stable_hash, shingle_set)
+    else:
+        values = [hashes[shingle] if shingle in hashes else hashes.setdefault(shingle, _stable_hash(shingle))
+                  for shingle in shingle_set]
+    mins = [_EMPTY] * SIGNATURE_SIZE
+    for value in values:
+        bucket = value % SIGNATURE_SIZE
+        if value < mins[bucket]:
+            mins[bucket] = value
+    if all(value == _EMPTY for value in mins):
+        return None
+    signature = list(mins)
+    for i in range(SIGNATURE_SIZE):
+        if mins[i] == _EMPTY:
+            offset = 1
+            while mins[(i + offset) % SIGNATURE_SIZE] == _EMPTY:
+                offset += 1
+            signature[i] = (mins[(i + offset) % SIGNATURE_SIZE], offset)
+    return signature
+
+
+def band_rows(threshold):
+    """选择每段行数：在相似度恰为 threshold 时召回率不低于 TARGET_RECALL 的前提下尽量多，以减少候选"""
+    for rows in range(8, 0, -1):
+        bands = SIGNATURE_SIZE // rows
+        if 1 - (1 - threshold ** rows) ** bands >= TARGET_RECALL:
+            return rows
+    return 1
+
+
+def _priority_rank(case):
+    return _PRIORITY_RANK.get(str(case.get("priority", "")).strip().upper(), len(_PRIORITY_RANK))
+
+
+def find_duplicate_groups(test_cases, threshold=DEFAULT_THRESHOLD):
+    """返回近似重复的用例下标分组列表（只包含成员数大于 1 的组），组内按原顺序排列"""
+    parent = list(range(len(test_cases)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # 文本完全相同的用例直接归为一组，只有每组的第一个参与 MinHash 比较
+    texts = [_case_text(case) if isinstance(case, dict) else "" for case in test_cases]
+    first_by_text = {}
+    representatives = []
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        first = first_by_text.setdefault(text, index)
+        if first == index:
+            representatives.append(index)
+        else:
+            parent[index] = first
+    shingle_sets = {index: _text_shingles(texts[index]) for index in representatives}
+
+    def union_if_similar(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            return
+        set_a, set_b = shingle_sets[a], shingle_sets[b]
+        if len(set_a & set_b) >= threshold * len(set_a | set_b):
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    rows = band_rows(threshold)
+    buckets = {}
+    hashes = {}
+    for index in representatives:
+        signature = minhash_signature(shingle_sets[index], hashes)
+        for start in range(0, SIGNATURE_SIZE - rows + 1, rows):
+            bucket = buckets.setdefault((start, tuple(signature[start:start + rows])), [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(index)
+            else:
+                union_if_similar(bucket[0], index)
+
+    checked = set()
+    for members in buckets.values():
+        for a, b in combinations(members, 2):
+            if (a, b) in checked:
+                continue
+            checked.add((a, b))
+            union_if_similar(a, b)
+
+    groups = {}
+    for index in range(len(test_cases)):
+        groups.setdefault(find(index), []).append(index)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def deduplicate(test_cases, threshold=DEFAULT_THRESHOLD):
+    """去除近似重复用例，返回 (保留的用例列表, 被移除的用例数)，保留的用例保持原顺序"""
+    removed = set()
+    for members in find_duplicate_groups(test_cases, threshold):
+        keep = min(members, key=lambda index: (_priority_rank(test_cases[index]), index))
+        removed.update(index for index in members if index != keep)
+    kept = [case for index, case in enumerate(test_cases) if index not in removed]
+    return kept, len(removed)
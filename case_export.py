@@ -0,0 +1,153 @@
+"""测试用例导出
+
+将模型返回的用例转换为表格行并写入 Excel。
+"""
+import os
+import re
+
+from case_schema import format_steps
+
+# 各输出格式的文件扩展名
+EXTENSIONS = {"excel": ".xlsx", "jsonl": ".jsonl", "csv": ".csv", "parquet": ".parquet"}
+# 导出表格的全部列，按顺序排列
+ALL_COLUMNS = ["用例ID", "模块", "用例标题", "前置条件", "测试步骤", "预期结果", "优先级", "测试结果", "备注"]
+# 常用列的显示宽度（字符数），其余列使用 Excel 默认宽度
+COLUMN_WIDTHS = {"用例ID": 10, "模块": 16, "用例标题": 36, "前置条件": 24, "测试步骤": 48, "预期结果": 40, "优先级": 8}
+# Sheet 名称的长度限制与非法字符
+SHEET_TITLE_MAX = 31
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+def extract_case_list(test_cases):
+    """从模型返回的数据中取出用例列表，返回 (用例列表, 格式是否符合预期)"""
+    if isinstance(test_cases, dict) and "test_cases" in test_cases:
+        return test_cases["test_cases"], True
+    if isinstance(test_cases, list):
+        return test_cases, True
+    return [test_cases], False
+
+
+def select_columns(include_id=True, include_priority=True, include_precondition=True):
+    """根据导出选项返回需要输出的列"""
+    excluded = set()
+    if not include_id:
+        excluded.add("用例ID")
+    if not include_priority:
+        excluded.add("优先级")
+    if not include_precondition:
+        excluded.add("前置条件")
+    return [column for column in ALL_COLUMNS if column not in excluded]
+
+
+def case_to_row(idx, case):
+    """将单个用例转换为导出用的行（字典），idx 从 1 开始"""
+    directory = case.get("directory", "未分类模块")
+    # 步骤原有的序号先去掉再统一编号，步骤为空时输出空单元格
+    steps = format_steps(case.get("steps"))
+    priority = case.get("priority", "P1")
+
+    return {
+        "用例ID": f"TC-{idx:03d}",
+        "模块": directory,
+        "用例标题": case.get("title", f"未命名用例{idx}"),
+        "前置条件": case.get("precondition", ""),
+        "测试步骤": steps,
+        "预期结果": case.get("expected_result", ""),
+        "优先级": priority,
+        "测试结果": "",
+        "备注": ""
+    }
+
+
+def output_path_for(output_path, output_format):
+    """根据界面中填写的输出路径（通常为 .xlsx）得到指定格式的文件路径"""
+    base, extension = os.path.splitext(output_path)
+    if extension.lower() not in EXTENSIONS.values():
+        base = output_path
+    return base + EXTENSIONS[output_format]
+
+
+class ExcelCaseWriter:
+    """流式 Excel 写入器
+
+    基于 openpyxl 的 write-only 工作簿，每调用一次 append() 就把一行写入临时文件，
+    不在内存中保留已写入的行，适合十万级以上的用例。split_by_module 为 True 时
+    每个模块（directory）单独一个 Sheet，用例 ID 仍全局连续编号。
+    """
+
+    def __init__(self, output_path, columns=None, split_by_module=False, default_sheet="测试用例"):
+        from openpyxl import Workbook
+
+        self.output_path = output_path_for(output_path, "excel")
+        self.columns = columns or list(ALL_COLUMNS)
+        self.split_by_module = split_by_module
+        self.default_sheet = default_sheet
+        self.count = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheets = {}
+        self._sheet_titles = set()
+
+    def append(self, case):
+        self.count += 1
+        row = case_to_row(self.count, case)
+        sheet = self._sheet(row["模块"] if self.split_by_module else self.default_sheet)
+        sheet.append([row[column] for column in self.columns])
+
+    def extend(self, cases):
+        for case in cases:
+            self.append(case)
+
+    def _sheet(self, name):
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            sheet = self._workbook.create_sheet(self._unique_title(name))
+            self._write_header(sheet)
+            self._sheets[name] = sheet
+        return sheet
+
+    def _unique_title(self, name):
+        base = _INVALID_SHEET_CHARS.sub("_", str(name)).strip("' ") or self.default_sheet
+        base = base[:SHEET_TITLE_MAX]
+        title = base
+        suffix = 2
+        while title.lower() in self._sheet_titles:
+            tail = f"_{suffix}"
+            title = base[:SHEET_TITLE_MAX - len(tail)] + tail
+            suffix += 1
+        self._sheet_titles.add(title.lower())
+        return title
+
+    def _write_header(self, sheet):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        # write-only 模式下列宽必须在写入第一行之前设置
+        for index, column in enumerate(self.columns, 1):
+            if column in COLUMN_WIDTHS:
+                sheet.column_dimensions[get_column_letter(index)].width = COLUMN_WIDTHS[column]
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+
+    def close(self):
+        """保存工作簿并返回文件路径；没有任何用例时也会输出只含表头的 Sheet"""
+        if not self._sheets:
+            self._sheet(self.default_sheet)
+        self._workbook.save(self.output_path)
+        return self.output_path
+
+
+def export_excel(test_cases_list, output_path, include_id=True, include_priority=True, include_precondition=True,
+                 split_by_module=False):
+    """将用例导出为 Excel，返回实际写入的文件路径（扩展名统一为 .xlsx）"""
+    writer = ExcelCaseWriter(
+        output_path,
+        columns=select_columns(include_id, include_priority, include_precondition),
+        split_by_module=split_by_module,
+    )
+    writer.extend(test_cases_list)
+    return writer.close()
@@ -0,0 +1,38 @@
+"""生成结束后的后处理与导出
+
+规范化校验 → 近似去重 → 写入所选格式 → 保存校验报告，界面的后台导出任务与命令行批处理共用。
+进度通过回调报告，可在任意线程中执行。
+"""
+from case_dedup import deduplicate
+from case_schema import normalize_cases, report_path
+from case_sinks import export_cases, DEFAULT_FORMATS, DEFAULT_BATCH_SIZE
+
+
+def finalize_cases(test_cases_list, output_path, formats=DEFAULT_FORMATS, include_id=True, include_priority=True,
+                   include_precondition=True, split_by_module=False, batch_size=DEFAULT_BATCH_SIZE,
+                   dedup_threshold=None, validation_report=True, on_stage=None, on_progress=None):
+    """后处理并导出一批用例，返回结果字典
+
+    dedup_threshold 为 None 时不去重；validation_report 为 False 时不保存校验报告。
+    on_stage(message) 在每个阶段开始时调用，on_progress 见 case_sinks.export_cases。
+    返回 {"cases": 最终用例列表, "outputs": 写入的文件路径, "removed": 去除的重复用例数,
+          "report": 校验报告, "report_path": 校验报告路径（未保存时为 None）}。
+    """
+    on_stage = on_stage or (lambda message: None)
+    on_stage(f"正在规范化与校验 {len(test_cases_list)} 个用例...")
+    test_cases_list, report = normalize_cases(test_cases_list)
+    removed = 0
+    if dedup_threshold is not None:
+        on_stage(f"正在去除近似重复用例（{len(test_cases_list)} 个）...")
+        test_cases_list, removed = deduplicate(test_cases_list, dedup_threshold)
+
+    on_stage(f"正在导出 {len(test_cases_list)} 个用例...")
+    outputs = export_cases(
+        test_cases_list, output_path, formats=formats,
+        include_id=include_id, include_priority=include_priority, include_precondition=include_precondition,
+        split_by_module=split_by_module, batch_size=batch_size, on_progress=on_progress)
+    saved_report = None
+    if report and validation_report:
+        saved_report = report.save(report_path(outputs[0]))
+    return {"cases": test_cases_list, "outputs": outputs, "removed": removed, "report": report,
+            "report_path": saved_report}
@@ -0,0 +1,210 @@
+"""测试用例规范化与校验
+
+模型返回的用例在去重与导出之前统一经过这里：按列批量规范化各字段（文本去空白、
+步骤去掉原有序号、优先级统一为 P0/P1/P2），并按模式校验必填字段与类型，
+把每个用例的问题收集到校验报告中。能修正的问题（如缺少优先级）使用默认值补全，
+无法作为用例使用的条目（非对象、标题与步骤都为空）被丢弃。
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+PRIORITIES = ("P0", "P1", "P2")
+DEFAULT_PRIORITY = "P1"
+DEFAULT_DIRECTORY = "未分类模块"
+
+# 用例模式：字段 -> (允许的类型, 是否必填)；导出列依次来自这些字段，其余字段原样保留
+CASE_SCHEMA = {
+    "directory": ((str,), True),
+    "title": ((str,), True),
+    "precondition": ((str, list), False),
+    "steps": ((list, str), True),
+    "expected_result": ((str, list), True),
+    "priority": ((str, int), True),
+}
+FIELDS = tuple(CASE_SCHEMA)
+_SCHEMA_KEYS = CASE_SCHEMA.keys()
+REQUIRED_FIELDS = frozenset(field for field, (_, required) in CASE_SCHEMA.items() if required)
+_TYPE_NAMES = {str: "字符串", list: "列表", int: "整数"}
+_TYPE_ERRORS = {field: f"{field} 类型应为{'或'.join(_TYPE_NAMES[t] for t in types)}"
+                for field, (types, _) in CASE_SCHEMA.items()}
+
+# 步骤开头已有的序号："1. "、"2、"、"3）"、"(4)"、"步骤5："；不匹配 "1.5倍速" 之类的内容
+_STEP_NUMBER = re.compile(r'(?:\d+\s*(?:[.．](?!\d)|[、):：）])|[(（]\d+[)）]|步骤\s*\d+\s*[:：.、]?)\s*')
+# 只有以这些字符开头的步骤才可能带序号，其余步骤无需执行正则
+_STEP_NUMBER_STARTS = frozenset("0123456789(（步")
+_LINE_SPLIT = re.compile(r'\s*\n\s*')
+_PRIORITY_NUMBER = re.compile(r'^[Pp]?\s*([0-2])(?:级)?$')
+_PRIORITY_SUFFIX = re.compile(r'\s*(?:优先级)?$')
+_PRIORITY_WORDS = {
+    "最高": "P0", "紧急": "P0", "高": "P0", "critical": "P0", "highest": "P0", "high": "P0", "blocker": "P0",
+    "中": "P1", "普通": "P1", "medium": "P1", "normal": "P1", "major": "P1",
+    "低": "P2", "low": "P2", "minor": "P2", "lowest": "P2", "trivial": "P2",
+}
+
+
+def strip_step_number(step):
+    """去掉步骤开头已有的序号与首尾空白"""
+    step = step.strip()
+    if step[:1] in _STEP_NUMBER_STARTS:
+        step = _STEP_NUMBER.sub("", step, count=1).strip()
+    return step
+
+
+def step_list(steps):
+    """将步骤（列表或多行文本）转换为不含序号的步骤列表，忽略空步骤"""
+    if steps is None:
+        return []
+    if isinstance(steps, str):
+        steps = _LINE_SPLIT.split(steps)
+    elif not isinstance(steps, list):
+        steps = [steps]
+    result = []
+    for step in steps:
+        if step is None:
+            continue
+        step = strip_step_number(step if isinstance(step, str) else str(step))
+        if step:
+            result.append(step)
+    return result
+
+
+def format_steps(steps):
+    """步骤列表或文本统一编号为 "1. ..." 的多行文本；步骤为空时返回空字符串"""
+    return "\n".join(f"{index}. {step}" for index, step in enumerate(step_list(steps), 1))
+
+
+def normalize_priority(value):
+    """将各种写法的优先级统一为 P0/P1/P2，无法识别时返回 None"""
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        return None
+    return _normalize_priority_text(str(value))
+
+
+@lru_cache(maxsize=1024)
+def _normalize_priority_text(value):
+    # 同一批用例中优先级的写法很少，按原文缓存结果
+    text = value.strip()
+    match = _PRIORITY_NUMBER.match(text)
+    if match:
+        return PRIORITIES[int(match.group(1))]
+    return _PRIORITY_WORDS.get(_PRIORITY_SUFFIX.sub("", text).lower())
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return "\n".join(str(item).strip() for item in value if item is not None)
+    return str(value)
+
+
+class ValidationReport:
+    """一批用例的校验结果：每个有问题的用例一条记录（index 为在原列表中的序号，从 1 开始）"""
+
+    def __init__(self, total=0):
+        self.total = total
+        self.dropped = 0
+        self._issues = {}
+
+    def add(self, index, error, title=""):
+        issue = self._issues.get(index)
+        if issue is None:
+            issue = self._issues[index] = {"index": index + 1, "title": title, "errors": []}
+        issue["errors"].append(error)
+
+    @property
+    def issues(self):
+        return [self._issues[index] for index in sorted(self._issues)]
+
+    def __bool__(self):
+        return bool(self._issues)
+
+    def summary_text(self):
+        if not self._issues:
+            return ""
+        text = f"{len(self._issues)} 个用例存在格式问题（已按默认值修正）"
+        if self.dropped:
+            text += f"，其中 {self.dropped} 个无法使用已丢弃"
+        return text
+
+    def to_dict(self):
+        return {"total": self.total, "invalid": len(self._issues), "dropped": self.dropped, "issues": self.issues}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+def report_path(output_path):
+    """与导出文件同目录的校验报告路径"""
+    return os.path.splitext(output_path)[0] + "_校验报告.json"
+
+
+def normalize_cases(test_cases):
+    """规范化并校验一批用例，返回 (规范化后的用例列表, 校验报告)
+
+    先按列取出各字段，在每一列上批量完成类型检查与转换，最后再按行组装，
+    规范化后的 steps 为不含序号的步骤列表，priority 为 P0/P1/P2。
+    """
+    report = ValidationReport(len(test_cases))
+    positions = []
+    records = []
+    for index, case in enumerate(test_cases):
+        if isinstance(case, dict):
+            positions.append(index)
+            records.append(case)
+        else:
+            report.add(index, f"不是 JSON 对象（{type(case).__name__}）")
+            report.dropped += 1
+
+    columns = {field: [record.get(field) for record in records] for field in FIELDS}
+    titles = [_text(title) for title in columns["title"]]
+
+    # 必填字段与类型检查
+    for row, record in enumerate(records):
+        missing = REQUIRED_FIELDS.difference(record)
+        for field in sorted(missing):
+            report.add(positions[row], f"缺少字段 {field}", titles[row])
+    for field, (types, _) in CASE_SCHEMA.items():
+        for row, value in enumerate(columns[field]):
+            if value is not None and not isinstance(value, types):
+                report.add(positions[row], _TYPE_ERRORS[field], titles[row])
+
+    steps = list(map(step_list, columns["steps"]))
+    priorities = list(map(normalize_priority, columns["priority"]))
+    directories = [_text(directory) or DEFAULT_DIRECTORY for directory in columns["directory"]]
+    preconditions = list(map(_text, columns["precondition"]))
+    expected_results = [format_steps(value) if isinstance(value, list) else _text(value)
+                        for value in columns["expected_result"]]
+
+    for row, step in enumerate(steps):
+        if not step and "steps" in records[row]:
+            report.add(positions[row], "steps 为空", titles[row])
+    for row, priority in enumerate(priorities):
+        value = columns["priority"][row]
+        if priority is None and value is not None:
+            report.add(positions[row], f"无法识别的优先级 {value!r}，已设为 {DEFAULT_PRIORITY}", titles[row])
+
+    normalized = []
+    for row, record in enumerate(records):
+        if not titles[row] and not steps[row]:
+            report.add(positions[row], "标题与步骤均为空，已丢弃")
+            report.dropped += 1
+            continue
+        case = {
+            "directory": directories[row],
+            "title": titles[row] or f"未命名用例{positions[row] + 1}",
+            "precondition": preconditions[row],
+            "steps": steps[row],
+            "expected_result": expected_results[row],
+            "priority": priorities[row] or DEFAULT_PRIORITY,
+        }
+        if not _SCHEMA_KEYS >= record.keys():
+            case.update((key, value) for key, value in record.items() if key not in CASE_SCHEMA)
+        normalized.append(case)
+    return normalized, report
@@ -0,0 +1,263 @@
+"""测试用例输出格式
+
+除 Excel 外支持 JSONL、CSV、Parquet 三种输出，与 Excel 共用同一套列选择（select_columns）
+与行转换（case_to_row）。每种输出都提供 append / extend / close 接口：
+- JSONL：每个用例一行，写入后立即 flush 并定期 fsync；live 模式下在生成过程中边解析边追加，
+  程序崩溃或生成中途失败时已解析的用例仍保留在文件中
+- CSV、Parquet：按批写入，close 时才替换目标文件，不会留下写了一半的文件
+Parquet 依赖可选的 pyarrow，未安装时给出安装提示。各输出的 bytes_written 为已写入磁盘的字节数，
+export_cases 据此报告导出进度。
+"""
+import csv
+import json
+import os
+import queue
+import threading
+import time
+
+from case_export import ALL_COLUMNS, EXTENSIONS, ExcelCaseWriter, case_to_row, output_path_for, select_columns
+from case_schema import normalize_cases
+
+DEFAULT_FORMATS = ("excel",)
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FSYNC_EVERY = 100
+DEFAULT_FSYNC_INTERVAL = 1.0
+# 通知实时写入线程结束
+_CLOSE = object()
+
+
+def _temp_path(path):
+    """写入过程中使用的临时文件；同一进程内多个线程写同名文件时互不干扰"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _fsync(file):
+    file.flush()
+    try:
+        os.fsync(file.fileno())
+    except OSError:
+        pass
+
+
+class JsonlCaseSink:
+    """JSONL 输出，线程安全，可在多个分块并发回调中直接调用 append
+
+    live 为 True 时直接追加到目标文件，并对每个用例先做规范化（不去重）；否则写入临时文件，
+    close 时替换目标文件，用于生成结束后按最终结果重写。
+
+    live 模式下 append 通常在生成引擎的事件循环线程中被调用，只把用例放入队列即返回，
+    规范化、写入与 fsync 由专用的写入线程完成，不阻塞其他进行中的流；close 时等待队列写完。
+    """
+
+    def __init__(self, output_path, columns=None, live=False, fsync_every=DEFAULT_FSYNC_EVERY,
+                 fsync_interval=DEFAULT_FSYNC_INTERVAL):
+        self.output_path = output_path_for(output_path, "jsonl")
+        self.columns = columns or list(ALL_COLUMNS)
+        self.live = live
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._path = self.output_path if live else _temp_path(self.output_path)
+        self._file = open(self._path, 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._queue = None
+        self._writer = None
+        if live:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="jsonl-live-writer", daemon=True)
+            self._writer.start()
+
+    def append(self, case):
+        if self._queue is not None:
+            self._queue.put(case)
+        else:
+            self._write(case)
+
+    def _write_loop(self):
+        """实时写入线程：依次写入队列中的用例，空闲超过 fsync_interval 时把未同步的内容落盘"""
+        while True:
+            try:
+                case = self._queue.get(timeout=self.fsync_interval or None)
+            except queue.Empty:
+                with self._lock:
+                    if self._file is not None and self._unsynced:
+                        self._sync()
+                continue
+            if case is _CLOSE:
+                return
+            self._write(case)
+
+    def _write(self, case):
+        if self.live:
+            cases, _ = normalize_cases([case])
+            if not cases:
+                return
+            case = cases[0]
+        with self._lock:
+            if self._file is None:
+                return
+            self.count += 1
+            row = case_to_row(self.count, case)
+            self._file.write(json.dumps({column: row[column] for column in self.columns}, ensure_ascii=False) + "\n")
+            self._unsynced += 1
+            if self.live:
+                self._file.flush()
+                if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                    self._sync()
+
+    def extend(self, cases):
+        for case in cases:
+            self.append(case)
+
+    @property
+    def bytes_written(self):
+        with self._lock:
+            return self._file.tell() if self._file is not None else os.path.getsize(self.output_path)
+
+    def _sync(self):
+        _fsync(self._file)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(_CLOSE)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            if self._file is None:
+                return self.output_path
+            self._sync()
+            self._file.close()
+            self._file = None
+            if not self.live:
+                os.replace(self._path, self.output_path)
+        return self.output_path
+
+
+class _BatchCaseSink:
+    """按批写入的输出：累积 batch_size 行后调用 _write_batch，close 时把临时文件替换为目标文件"""
+    output_format = None
+
+    def __init__(self, output_path, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.output_path = output_path_for(output_path, self.output_format)
+        self.columns = columns or list(ALL_COLUMNS)
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._path = _temp_path(self.output_path)
+        self._batch = []
+
+    def append(self, case):
+        self.count += 1
+        row = case_to_row(self.count, case)
+        self._batch.append([row[column] for column in self.columns])
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def extend(self, cases):
+        for case in cases:
+            self.append(case)
+
+    def _flush(self):
+        if self._batch:
+            self._write_batch(self._batch)
+            self._batch = []
+
+    @property
+    def bytes_written(self):
+        try:
+            return os.path.getsize(self._path)
+        except OSError:
+            return 0
+
+    def close(self):
+        self._flush()
+        self._finish()
+        os.replace(self._path, self.output_path)
+        return self.output_path
+
+
+class CsvCaseSink(_BatchCaseSink):
+    """CSV 输出，使用带 BOM 的 UTF-8 以便 Excel 直接打开"""
+    output_format = "csv"
+
+    def __init__(self, output_path, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(output_path, columns, batch_size)
+        self._file = open(self._path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def _write_batch(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _finish(self):
+        _fsync(self._file)
+        self._file.close()
+
+
+class ParquetCaseSink(_BatchCaseSink):
+    """Parquet 输出，每批写入一个 row group，所有列均为字符串"""
+    output_format = "parquet"
+
+    def __init__(self, output_path, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("导出 Parquet 需要安装 pyarrow：pip install pyarrow")
+        super().__init__(output_path, columns, batch_size)
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in self.columns])
+        self._writer = pyarrow.parquet.ParquetWriter(self._path, self._schema)
+
+    def _write_batch(self, rows):
+        data = {column: [str(row[index]) for row in rows] for index, column in enumerate(self.columns)}
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+
+    def _finish(self):
+        self._writer.close()
+
+
+def open_sink(output_format, output_path, columns=None, split_by_module=False, batch_size=DEFAULT_BATCH_SIZE):
+    """按格式名创建输出（生成结束后一次性写入最终结果时使用）"""
+    if output_format == "excel":
+        return ExcelCaseWriter(output_path, columns=columns, split_by_module=split_by_module)
+    if output_format == "jsonl":
+        return JsonlCaseSink(output_path, columns)
+    if output_format == "csv":
+        return CsvCaseSink(output_path, columns, batch_size)
+    if output_format == "parquet":
+        return ParquetCaseSink(output_path, columns, batch_size)
+    raise ValueError(f"不支持的输出格式: {output_format}")
+
+
+def export_cases(test_cases_list, output_path, formats=DEFAULT_FORMATS, include_id=True, include_priority=True,
+                 include_precondition=True, split_by_module=False, batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+    """将用例写入所选的全部格式，返回实际写入的文件路径列表
+
+    on_progress(rows_written, total_rows, bytes_written) 每写入 batch_size 行及每个文件保存后调用，
+    行数按全部格式累计；Excel 在保存时才写入磁盘，其字节数在保存后计入。
+    """
+    columns = select_columns(include_id, include_priority, include_precondition)
+    batch_size = max(1, batch_size)
+    total = len(test_cases_list) * len(formats)
+    written = 0
+    saved_bytes = 0
+    paths = []
+    for output_format in formats:
+        sink = open_sink(output_format, output_path, columns, split_by_module, batch_size)
+        for start in range(0, len(test_cases_list), batch_size):
+            batch = test_cases_list[start:start + batch_size]
+            sink.extend(batch)
+            written += len(batch)
+            if on_progress is not None:
+                on_progress(written, total, saved_bytes + getattr(sink, "bytes_written", 0))
+        path = sink.close()
+        paths.append(path)
+        saved_bytes += os.path.getsize(path)
+        if on_progress is not None:
+            on_progress(written, total, saved_bytes)
+    return paths
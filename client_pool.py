@@ -0,0 +1,92 @@
+"""进程级 API 客户端池
+
+按 (base_url, api_key) 复用 AsyncOpenAI 客户端及其底层 httpx 连接池，连续多次生成、
+分块并发、对冲请求都共享已建立的 TCP/TLS 连接。客户端只在 generation_engine 的事件循环中使用，
+进程退出时由引擎在该循环中关闭全部连接。
+"""
+import importlib
+import threading
+from importlib.util import find_spec
+
+DEFAULT_NETWORK_CONFIG = {
+    "connect_timeout": 10,
+    "read_timeout": 300,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 120,
+    "http2": False,
+}
+
+
+class ClientPool:
+    """AsyncOpenAI 客户端池，线程安全"""
+
+    def __init__(self, network_config=None):
+        self._settings = dict(DEFAULT_NETWORK_CONFIG)
+        self._clients = {}
+        self._lock = threading.Lock()
+        if network_config:
+            self.configure(network_config)
+
+    def configure(self, network_config):
+        """更新连接参数（config.json 的 network 节）；已创建的客户端不受影响"""
+        with self._lock:
+            self._settings.update({key: value for key, value in network_config.items()
+                                   if key in DEFAULT_NETWORK_CONFIG})
+
+    def get_client(self, base_url, api_key):
+        """返回 (base_url, api_key) 对应的共享客户端，不存在时创建"""
+        key = (base_url.rstrip("/"), api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(base_url, api_key)
+                self._clients[key] = client
+            return client
+
+    def _create_client(self, base_url, api_key):
+        # openai 导入较慢，推迟到第一次调用API时
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        # 不同版本的 openai 基于 httpx 或 httpx2，Limits/Timeout 必须来自同一个库
+        httpx = importlib.import_module(DefaultAsyncHttpxClient.__bases__[0].__module__.split(".")[0])
+
+        settings = self._settings
+        http2 = bool(settings["http2"])
+        if http2 and find_spec("h2") is None:
+            print("未安装 h2 包，HTTP/2 不可用，已回退到 HTTP/1.1（可执行 pip install httpx[http2]）")
+            http2 = False
+
+        http_client = DefaultAsyncHttpxClient(
+            http2=http2,
+            timeout=httpx.Timeout(settings["read_timeout"], connect=settings["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            ),
+        )
+        # 重试由 rate_limit.call_with_retry_async 统一处理，关闭 SDK 自带的重试以免叠加
+        return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+    async def aclose(self):
+        """关闭全部客户端及其连接，须在使用这些客户端的事件循环中调用"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"关闭API客户端失败: {e}")
+
+
+default_pool = ClientPool()
+
+
+def configure(network_config):
+    default_pool.configure(network_config)
+
+
+def get_client(base_url, api_key):
+    return default_pool.get_client(base_url, api_key)
@@ -1,6 +1,7 @@
 import sys
 import json
 import os
+import importlib.util
 from PyQt5.QtGui import QFont
 
 if hasattr(sys, 'frozen'):
@@ -8,10 +9,27 @@ if hasattr(sys, 'frozen'):
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QTextEdit, QPushButton,
                              QFileDialog, QMessageBox, QGroupBox, QProgressBar,
-                             QSplitter, QComboBox, QCheckBox, QTabWidget, QStatusBar)
-from PyQt5.QtCore import Qt, pyqtSignal, QThread
-import pandas as pd
-from openai import OpenAI
+                             QSplitter, QComboBox, QCheckBox, QTabWidget, QStatusBar, QSpinBox,
+                             QTableView, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer
+from generation_core import (TestCaseGenerator, GenerationError, build_hedge_config, routing_candidates, route_request,
+                             DEFAULT_CHUNK_MAX_TOKENS, DEFAULT_MAX_WORKERS, DEFAULT_MAX_CONTINUATIONS)
+from response_cache import ResponseCache
+import client_pool
+import generation_engine
+from case_export import extract_case_list, select_columns
+from case_sinks import (JsonlCaseSink, DEFAULT_FORMATS, DEFAULT_BATCH_SIZE, DEFAULT_FSYNC_EVERY,
+                        DEFAULT_FSYNC_INTERVAL)
+from case_schema import PRIORITIES
+from case_pipeline import finalize_cases
+from requirement_reader import read_requirement_file
+from telemetry import metrics_log_path
+from model_router import AUTO_SERVICE
+from results_model import CaseTableModel
+from case_dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+
+# 首次生成、导出时才导入的依赖，启动器在后台预热时提前导入
+PREWARM_MODULES = ("openai", "openpyxl")
 
 # 定义主程序样式表
 STYLESHEET = """
@@ -133,147 +151,120 @@ STYLESHEET = """
 """
 
 
-class WorkerThread(QThread):
-    """用于后台处理的工作线程"""
+class GenerationTask(QObject):
+    """一次界面发起的生成任务，生成逻辑见 generation_core.TestCaseGenerator
+
+    任务在共享生成引擎（generation_engine）的任务线程中执行，流式调用在引擎的事件循环中进行；
+    回调通过信号送回界面线程。
+    """
     finished = pyqtSignal(object)
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
+    case_parsed = pyqtSignal(object)  # 每解析出一个完整用例即发出
 
-    def __init__(self, api_key, base_url, model, system_prompt, user_prompt, requirements, service_type):
+    def __init__(self, api_key, base_url, model, system_prompt, user_prompt, requirements, service_type,
+                 live_sink=None, **options):
         super().__init__()
-        self.api_key = api_key
-        self.base_url = base_url
-        self.model = model
-        self.system_prompt = system_prompt
-        self.user_prompt = user_prompt
-        self.requirements = requirements
-        self.service_type = service_type  # "DeepSeek", "MiMo", "智普AI", "Kimi" 或 "MiniMax"
+        self.live_sink = live_sink  # 边解析边写入的 JSONL 输出，为 None 时不写
+        self.generator = TestCaseGenerator(
+            api_key, base_url, model, system_prompt, user_prompt, requirements, service_type,
+            on_case=self.onCase, on_progress=self.progress.emit, **options)
+        self._future = None
+
+    def onCase(self, case):
+        # 在引擎线程中调用，只放入实时输出的写入队列，写盘由其写入线程完成，不阻塞事件循环也不经过界面线程
+        if self.live_sink is not None:
+            self.live_sink.append(case)
+        self.case_parsed.emit(case)
+
+    def start(self):
+        self._future = generation_engine.default_engine().submit_job(self.run)
+
+    def isRunning(self):
+        return self._future is not None and not self._future.done()
 
     def run(self):
         try:
-            self.progress.emit("正在初始化API客户端...")
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-            )
-
-            self.progress.emit("正在生成测试用例...")
-            if self.user_prompt == '':
-                tips = ""
-            else:
-                tips = "补充说明："
-            formatted_prompt = tips + self.user_prompt + ',\n需求如下：\n' + self.requirements
-
-            api_params = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": formatted_prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 24576,
-                "stream": True,
-            }
-
-            if self.service_type == "MiMo":
-                api_params["extra_body"] = {"thinking": {"type": "disabled"}}
-                api_params["temperature"] = 0.3
-                api_params["top_p"] = 0.95
-            elif self.service_type == "智普AI":
-                api_params["extra_body"] = {"thinking": {"type": "enabled"}}
-                api_params["temperature"] = 0.7
-            elif self.service_type == "Kimi":
-                api_params["temperature"] = 0.6
-                api_params["top_p"] = 0.95
-            elif self.service_type == "MiniMax":
-                api_params["temperature"] = 0.4
-                api_params["top_p"] = 0.9
-                # MiniMax特定参数
-                api_params["extra_body"] = {
-                    "tokens_to_generate": 24576,
-                    "skip_unknown_tokens": True,
-                    "thinking": {"type": "disabled"}
-                }
-            elif self.service_type == "腾讯混元":
-                # 腾讯混元模型参数配置
-                api_params["temperature"] = 0.5
-                api_params["top_p"] = 0.9
-                api_params["max_tokens"] = 32768
-
-            self.progress.emit("正在调用API，请稍候...")
-            response = client.chat.completions.create(**api_params)
-
-            full_response = ""
-            for chunk in response:
-                if not hasattr(chunk, 'choices') or not chunk.choices:
-                    continue
-                try:
-                    choice = chunk.choices[0]
-                    if self.service_type in ["智普AI", "Kimi"]:
-                        if hasattr(choice, 'delta') and choice.delta is not None:
-                            delta = choice.delta
-                            if hasattr(delta, 'content') and delta.content is not None:
-                                content_piece = delta.content
-                                full_response += content_piece
-                    else:
-                        if hasattr(choice, 'delta') and choice.delta is not None:
-                            delta = choice.delta
-                            if hasattr(delta, 'content') and delta.content is not None:
-                                content_piece = delta.content
-                                full_response += content_piece
-                except IndexError:
-                    continue
-                except Exception as e:
-                    print(f"处理数据块时遇到意外错误: {e}")
-                    continue
-
-            self.progress.emit("API响应接收完成，正在解析...")
-
-            if not full_response.strip():
-                self.error.emit("API返回的响应内容为空，请检查您的请求参数和网络连接。")
-                return
+            self.finished.emit(self.generator.generate())
+        except GenerationError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            self.error.emit(f"API调用失败: {str(e)}")
 
-            print(f"原始响应预览: {full_response[:500]}...")
-            try:
-                test_cases = json.loads(full_response)
-                self.finished.emit(test_cases)
-            except json.JSONDecodeError:
-                try:
-                    import re
-                    json_match = re.search(r'(\[.*\]|\{.*\})', full_response, re.DOTALL)
-                    if json_match:
-                        extracted_json = json_match.group(0)
-                        test_cases = json.loads(extracted_json)
-                        self.finished.emit(test_cases)
-                    else:
-                        self.error.emit("无法从API响应中提取有效的JSON数据。响应内容为:\n" + full_response[:1000])
-                except Exception as parse_error:
-                    self.error.emit(f"解析JSON数据失败: {str(parse_error)}\n原始响应开头: {full_response[:500]}")
-            except Exception as e:
-                self.error.emit(f"处理API响应时发生意外错误: {str(e)}")
 
+class ExportTask(QObject):
+    """生成结束后的规范化、去重与导出（case_pipeline.finalize_cases），在生成引擎的任务线程池中执行，
+    导出期间界面保持响应，也可以开始下一次生成"""
+    stage = pyqtSignal(str)
+    progress = pyqtSignal(int, int, object)  # 已写入行数、总行数、已写入磁盘的字节数
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, test_cases_list, output_path, **options):
+        super().__init__()
+        self.test_cases_list = test_cases_list
+        self.output_path = output_path
+        self.options = options
+        self.source = None
+        self._future = None
+
+    def start(self):
+        self._future = generation_engine.default_engine().submit_job(self.run)
+
+    def isRunning(self):
+        return self._future is not None and not self._future.done()
+
+    def run(self):
+        try:
+            self.finished.emit(finalize_cases(self.test_cases_list, self.output_path, on_stage=self.stage.emit,
+                                              on_progress=self.progress.emit, **self.options))
         except Exception as e:
-            self.error.emit(f"API调用失败: {str(e)}")
+            self.error.emit(str(e))
+
+
+class RequirementImportTask(QObject):
+    """读取需求文件并按标题切分章节（requirement_reader），在生成引擎的任务线程池中执行，
+    读取大文件时界面保持响应"""
+    progress = pyqtSignal(object, object)  # 已读取字节数、总字节数
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._future = None
+
+    def start(self):
+        self._future = generation_engine.default_engine().submit_job(self.run)
+
+    def isRunning(self):
+        return self._future is not None and not self._future.done()
+
+    def run(self):
+        try:
+            self.finished.emit(read_requirement_file(self.path, on_progress=self.progress.emit))
+        except Exception as e:
+            self.error.emit(str(e))
 
 
 class TestGeneratorGUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, config=None):
         super().__init__()
-        self.loadConfig()
+        # 启动器预热时已在后台读取配置，直接使用，不再重复读取文件
+        if config is None:
+            self.loadConfig()
+        else:
+            self.config = config
+        client_pool.configure(self.config.get("network", {}))
+        generation_engine.configure(self.config.get("network", {}))
+        cache_config = self.config.get("cache", {})
+        self.response_cache = ResponseCache.from_config(cache_config) if cache_config.get("enabled", True) else None
         self.initUI()
 
     def loadConfig(self):
         """加载配置文件"""
-        if getattr(sys, 'frozen', False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.abspath(".")
-
-        config_path = os.path.join(base_path, 'config.json')
-
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            self.config = read_config()
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"加载配置文件失败: {e}，使用默认配置")
             self.config = self.get_default_config()
@@ -309,7 +300,7 @@ class TestGeneratorGUI(QMainWindow):
         service_layout = QHBoxLayout()
         service_layout.addWidget(QLabel("AI 服务:"))
         self.service_combo = QComboBox()
-        self.service_combo.addItems(["DeepSeek", "MiMo", "智普AI", "Kimi", "MiniMax", "腾讯混元"])
+        self.service_combo.addItems(["DeepSeek", "MiMo", "智普AI", "Kimi", "MiniMax", "腾讯混元", AUTO_SERVICE])
         self.service_combo.currentTextChanged.connect(self.onServiceChanged)
         service_layout.addWidget(self.service_combo, 1)
         api_group_layout.addLayout(service_layout)
@@ -351,6 +342,38 @@ class TestGeneratorGUI(QMainWindow):
         model_layout.addWidget(self.model_combo, 1)
         api_group_layout.addLayout(model_layout)
 
+        # 第五行：长需求分块并发数
+        generation_config = self.config.get("generation", {})
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("分块并发数:"))
+        self.max_workers_spin = QSpinBox()
+        self.max_workers_spin.setRange(1, 16)
+        self.max_workers_spin.setValue(generation_config.get("max_workers", DEFAULT_MAX_WORKERS))
+        self.max_workers_spin.setToolTip("需求较长时会按章节拆分，多个部分同时调用API")
+        workers_layout.addWidget(self.max_workers_spin, 1)
+        api_group_layout.addLayout(workers_layout)
+
+        # 第六行：对冲请求
+        hedging_config = self.config.get("hedging", {})
+        self.hedging_check = QCheckBox(
+            f"启用对冲请求（首字过慢时同时请求备用模型 "
+            f"{hedging_config.get('secondary_service', 'DeepSeek')}/{hedging_config.get('secondary_model', '')}）")
+        self.hedging_check.setChecked(hedging_config.get("enabled", False))
+        api_group_layout.addWidget(self.hedging_check)
+
+        # 第七行：响应缓存
+        self.cache_bypass_check = QCheckBox("跳过响应缓存（强制重新调用API）")
+        self.cache_bypass_check.setToolTip("相同的模型、提示词和需求默认直接复用上次的结果，勾选后重新生成并刷新缓存")
+        api_group_layout.addWidget(self.cache_bypass_check)
+
+        # 第八行：增量生成
+        self.incremental_check = QCheckBox("增量生成（只重新生成修改过或新增的需求章节）")
+        self.incremental_check.setToolTip("按标题记录每个需求章节的内容与生成的用例，未变化的章节直接复用上次的用例")
+        self.incremental_check.setChecked(self.config.get("incremental", {}).get("enabled", True))
+        self.incremental_check.toggled.connect(self.updateCacheBypassEnabled)
+        api_group_layout.addWidget(self.incremental_check)
+        self.updateCacheBypassEnabled()
+
         api_group.setLayout(api_group_layout)
         api_layout.addWidget(api_group)
 
@@ -381,7 +404,26 @@ class TestGeneratorGUI(QMainWindow):
         requirements_layout = QVBoxLayout(requirements_tab)
         requirements_layout.setContentsMargins(0, 0, 0, 0)
 
-        requirements_layout.addWidget(QLabel("需求详细内容 (支持粘贴 PRD/用户故事):"))
+        requirements_header = QHBoxLayout()
+        requirements_header.addWidget(QLabel("需求详细内容 (支持粘贴 PRD/用户故事，或导入 .md / .txt / .docx 文件):"))
+        requirements_header.addStretch()
+        self.import_requirements_btn = QPushButton("导入需求文件...")
+        self.import_requirements_btn.clicked.connect(self.importRequirementsFile)
+        requirements_header.addWidget(self.import_requirements_btn)
+        self.clear_import_btn = QPushButton("清除导入")
+        self.clear_import_btn.clicked.connect(self.clearImportedRequirements)
+        self.clear_import_btn.setVisible(False)
+        requirements_header.addWidget(self.clear_import_btn)
+        requirements_layout.addLayout(requirements_header)
+
+        # 导入的文件只在编辑器中显示预览，完整内容按章节直接交给生成任务
+        self.imported_requirements = None
+        self.import_task = None
+        self.import_status_label = QLabel()
+        self.import_status_label.setStyleSheet("color: #8c8c8c;")
+        self.import_status_label.setVisible(False)
+        requirements_layout.addWidget(self.import_status_label)
+
         self.requirements_input = QTextEdit()
         self.requirements_input.setPlaceholderText("在此输入需求内容...")
         requirements_layout.addWidget(self.requirements_input)
@@ -413,18 +455,86 @@ class TestGeneratorGUI(QMainWindow):
         self.include_priority.setChecked(self.config["output"]["include_priority"])
         self.include_precondition = QCheckBox("包含前置条件")
         self.include_precondition.setChecked(self.config["output"]["include_precondition"])
+        self.split_by_module = QCheckBox("按模块分 Sheet 导出")
+        self.split_by_module.setChecked(self.config["output"].get("split_by_module", False))
+        self.dedup_check = QCheckBox("去除近似重复用例（保留优先级最高的一条）")
+        self.dedup_check.setChecked(self.config["output"].get("dedup", True))
 
         options_layout.addWidget(self.include_id)
         options_layout.addWidget(self.include_priority)
         options_layout.addWidget(self.include_precondition)
+        options_layout.addWidget(self.split_by_module)
+        options_layout.addWidget(self.dedup_check)
         options_group.setLayout(options_layout)
         output_layout.addWidget(options_group)
+
+        # 输出格式：可多选，文件名与上面的路径相同、扩展名不同
+        formats_group = QGroupBox("输出格式")
+        formats_layout = QHBoxLayout()
+        selected_formats = self.config["output"].get("formats", list(DEFAULT_FORMATS))
+        self.format_checks = {
+            "excel": QCheckBox("Excel (.xlsx)"),
+            "jsonl": QCheckBox("JSONL（边生成边写入）"),
+            "csv": QCheckBox("CSV"),
+            "parquet": QCheckBox("Parquet（需安装 pyarrow）"),
+        }
+        for output_format, check in self.format_checks.items():
+            check.setChecked(output_format in selected_formats)
+            formats_layout.addWidget(check)
+        formats_group.setLayout(formats_layout)
+        output_layout.addWidget(formats_group)
         output_layout.addStretch()
 
+        # --- 生成结果选项卡：生成过程中按批追加已解析的用例，结束后显示去重后的最终结果 ---
+        results_tab = QWidget()
+        results_layout = QVBoxLayout(results_tab)
+
+        filter_layout = QHBoxLayout()
+        self.module_filter = QComboBox()
+        self.module_filter.addItem("全部模块")
+        self.module_filter.setMinimumWidth(160)
+        self.priority_filter = QComboBox()
+        self.priority_filter.addItems(["全部优先级", *PRIORITIES])
+        self.keyword_filter = QLineEdit()
+        self.keyword_filter.setPlaceholderText("按标题关键字筛选...")
+        for combo in (self.module_filter, self.priority_filter):
+            combo.currentIndexChanged.connect(self.applyResultsFilter)
+        self.keyword_filter.textChanged.connect(self.applyResultsFilter)
+        self.results_count_label = QLabel()
+        self.export_visible_btn = QPushButton("导出当前显示")
+        self.export_visible_btn.setEnabled(False)
+        self.export_visible_btn.clicked.connect(self.exportVisibleCases)
+        filter_layout.addWidget(QLabel("模块:"))
+        filter_layout.addWidget(self.module_filter)
+        filter_layout.addWidget(QLabel("优先级:"))
+        filter_layout.addWidget(self.priority_filter)
+        filter_layout.addWidget(self.keyword_filter)
+        filter_layout.addWidget(self.results_count_label)
+        filter_layout.addWidget(self.export_visible_btn)
+        results_layout.addLayout(filter_layout)
+
+        # 表格只向模型请求可见区域的单元格，行高固定、不按内容计算列宽，几万行时依然流畅
+        self.results_model = CaseTableModel(self)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setWordWrap(False)
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.results_table.horizontalHeader().setStretchLastSection(True)
+        for column, width in enumerate((60, 140, 260, 60, 320)):
+            self.results_table.setColumnWidth(column, width)
+        results_layout.addWidget(self.results_table)
+        self.pending_cases = []
+        self.updateResultsCount()
+
         # 添加选项卡
         tabs.addTab(api_tab, " ⚙️  API 设置")
         tabs.addTab(requirements_tab, " 📝 需求内容")
         tabs.addTab(output_tab, " 📂 输出设置")
+        tabs.addTab(results_tab, " 📋 生成结果")
 
         # 底部控制区域
         bottom_layout = QHBoxLayout()
@@ -443,11 +553,32 @@ class TestGeneratorGUI(QMainWindow):
         self.generate_btn.clicked.connect(self.generateTestCases)
         bottom_layout.addWidget(self.generate_btn)
 
+        # 取消按钮：生成期间可用
+        self.cancel_btn = QPushButton("⏹ 取消")
+        self.cancel_btn.setMinimumHeight(40)
+        self.cancel_btn.setFixedWidth(100)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancelGeneration)
+        bottom_layout.addWidget(self.cancel_btn)
+
         layout.addLayout(bottom_layout)
 
         # 状态栏
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
+        # 实时指标：生成期间按固定间隔刷新，避免每个数据块都重绘界面
+        self.metrics_label = QLabel()
+        self.statusBar.addPermanentWidget(self.metrics_label)
+        # 后台导出进度：已写入行数与数据量，导出期间可以继续生成
+        self.export_progress = QProgressBar()
+        self.export_progress.setFixedWidth(260)
+        self.export_progress.setVisible(False)
+        self.statusBar.addPermanentWidget(self.export_progress)
+        self.export_tasks = []
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(self.config.get("telemetry", {}).get("status_interval_ms", 500))
+        self.metrics_timer.timeout.connect(self.updateMetrics)
+        self.metrics_timer.timeout.connect(self.flushParsedCases)
 
     def onServiceChanged(self, service):
         """当切换AI服务时，更新对应的Base URL和模型列表"""
@@ -486,6 +617,14 @@ class TestGeneratorGUI(QMainWindow):
             self.model_combo.setCurrentText(self.config["api"]["tencent"]["default_model"])
             self.api_key_input.setText("")
             self.api_key_input.setPlaceholderText("请输入腾讯混元 API Key")
+        elif service == AUTO_SERVICE:
+            # 每次生成时按需求规模与实测记录从 routing.candidates 中选择，Key 与 Base URL 取自候选配置
+            self.base_url_input.setText("")
+            self.base_url_input.setPlaceholderText("自动选择（见 config.json 的 routing.candidates）")
+            self.model_combo.clear()
+            self.model_combo.addItem(AUTO_SERVICE)
+            self.api_key_input.setText("")
+            self.api_key_input.setPlaceholderText("自动选择时使用候选配置中的 API Key")
         else:  # DeepSeek
             self.base_url_input.setText(self.config["api"]["base_url"])
             self.model_combo.clear()
@@ -493,6 +632,10 @@ class TestGeneratorGUI(QMainWindow):
             self.model_combo.setCurrentText(self.config["api"]["default_model"])
             self.api_key_input.setText("")
             self.api_key_input.setPlaceholderText("请输入 DeepSeek API Key")
+        auto = service == AUTO_SERVICE
+        self.api_key_input.setEnabled(not auto)
+        self.base_url_input.setEnabled(not auto)
+        self.model_combo.setEnabled(not auto)
 
     def toggleKeyVisibility(self):
         """切换API Key的可见性"""
@@ -509,11 +652,63 @@ class TestGeneratorGUI(QMainWindow):
             self,
             "选择保存位置",
             self.output_path.text(),
-            "Excel文件 (*.xlsx);;所有文件 (*.*)"
+            "Excel文件 (*.xlsx);;JSONL文件 (*.jsonl);;CSV文件 (*.csv);;Parquet文件 (*.parquet);;所有文件 (*.*)"
         )
         if filename:
             self.output_path.setText(filename)
 
+    def importRequirementsFile(self):
+        """选择需求文件，在后台读取并切分章节"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "导入需求文件", "", "需求文件 (*.md *.txt *.docx);;所有文件 (*.*)")
+        if not filename:
+            return
+        self.import_requirements_btn.setEnabled(False)
+        self.statusBar.showMessage(f"正在读取需求文件 {os.path.basename(filename)}...")
+        self.import_task = RequirementImportTask(filename)
+        self.import_task.progress.connect(self.updateImportProgress)
+        self.import_task.finished.connect(self.handleRequirementsImported)
+        self.import_task.error.connect(self.handleImportError)
+        self.import_task.start()
+
+    def updateImportProgress(self, bytes_read, total_bytes):
+        if total_bytes:
+            self.statusBar.showMessage(f"正在读取需求文件 {bytes_read / total_bytes:.0%}...")
+
+    def handleRequirementsImported(self, document):
+        """导入完成：编辑器中只显示只读预览，生成时使用切分好的章节"""
+        # 先结束导入状态，后续界面更新出错时也不会一直禁止生成与再次导入
+        self.import_task = None
+        self.import_requirements_btn.setEnabled(True)
+        self.imported_requirements = document
+        self.requirements_input.setPlainText(document.preview)
+        self.requirements_input.setReadOnly(True)
+        self.import_status_label.setText(f"已导入 {document.summary()}；编辑器中为只读预览，"
+                                         f"如需手动编辑请先点击“清除导入”")
+        self.import_status_label.setVisible(True)
+        self.clear_import_btn.setVisible(True)
+        self.statusBar.showMessage(f"已导入需求文件：{document.summary()}")
+
+    def handleImportError(self, message):
+        self.import_task = None
+        self.import_requirements_btn.setEnabled(True)
+        self.statusBar.showMessage("导入需求文件失败")
+        QMessageBox.warning(self, "导入失败", f"无法导入需求文件：{message}")
+
+    def clearImportedRequirements(self):
+        """清除导入的需求文件，恢复手动输入"""
+        self.imported_requirements = None
+        self.requirements_input.clear()
+        self.requirements_input.setReadOnly(False)
+        self.import_status_label.setVisible(False)
+        self.clear_import_btn.setVisible(False)
+
+    def requirementsSource(self):
+        """本次生成的需求文本与已切分的章节；手动输入时章节为 None，由生成任务自行切分"""
+        if self.imported_requirements is not None:
+            return self.imported_requirements.text, self.imported_requirements.sections
+        return self.requirements_input.toPlainText(), None
+
     def generateTestCases(self):
         """生成测试用例（带验证）"""
         errors = self.validateInputs()
@@ -521,124 +716,286 @@ class TestGeneratorGUI(QMainWindow):
             QMessageBox.warning(self, "输入验证", "\n".join(errors))
             return
 
+        requirements, sections = self.requirementsSource()
+        target = self.generationTarget(requirements)
+
         self.generate_btn.setEnabled(False)
         self.generate_btn.setText("⏳ 生成中...")
+        self.cancel_btn.setEnabled(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)
-        self.statusBar.showMessage("正在生成测试用例，请稍候...")
-
-        current_service = self.service_combo.currentText()
+        if target["reason"]:
+            self.statusBar.showMessage(f"已自动选择 {target['service']}/{target['model']}：{target['reason']}")
+        else:
+            self.statusBar.showMessage("正在生成测试用例，请稍候...")
 
-        self.worker = WorkerThread(
-            api_key=self.api_key_input.text(),
-            base_url=self.base_url_input.text(),
-            model=self.model_combo.currentText(),
+        self.live_sink = None
+        if "jsonl" in self.selectedFormats():
+            output_config = self.config["output"]
+            try:
+                self.live_sink = JsonlCaseSink(
+                    self.output_path.text(), columns=self.selectedColumns(), live=True,
+                    fsync_every=output_config.get("fsync_every", DEFAULT_FSYNC_EVERY),
+                    fsync_interval=output_config.get("fsync_interval", DEFAULT_FSYNC_INTERVAL))
+            except OSError as e:
+                QMessageBox.warning(self, "警告", f"无法创建 JSONL 输出文件，本次不实时写入：{str(e)}")
+
+        self.worker = GenerationTask(
+            api_key=target["api_key"],
+            base_url=target["base_url"],
+            model=target["model"],
             system_prompt=self.system_prompt_input.toPlainText(),
             user_prompt=self.user_prompt_input.toPlainText(),
-            requirements=self.requirements_input.toPlainText(),
-            service_type=current_service
+            requirements=requirements,
+            sections=sections,
+            service_type=target["service"],
+            chunk_max_tokens=self.config.get("generation", {}).get("chunk_max_tokens", DEFAULT_CHUNK_MAX_TOKENS),
+            max_workers=self.max_workers_spin.value(),
+            hedge=self.buildHedgeConfig(target),
+            cache=self.response_cache,
+            cache_bypass=self.cache_bypass_check.isChecked(),
+            rate_limits=self.config.get("rate_limits", {}),
+            retry=self.config.get("retry", {}),
+            output_limits=self.config.get("output_limits", {}),
+            adaptive_max_tokens=self.config.get("generation", {}).get("adaptive_max_tokens", True),
+            max_continuations=self.config.get("generation", {}).get("max_continuations",
+                                                                    DEFAULT_MAX_CONTINUATIONS),
+            incremental=self.config.get("incremental", {}) if self.incremental_check.isChecked() else None,
+            metrics_log=metrics_log_path(self.config.get("telemetry", {})),
+            live_sink=self.live_sink
         )
 
         self.worker.finished.connect(self.handleTestCases)
         self.worker.error.connect(self.handleError)
         self.worker.progress.connect(self.updateProgress)
+        self.worker.case_parsed.connect(self.onCaseParsed)
+        self.parsed_case_count = 0
+        self.pending_cases = []
+        self.results_model.clear()
+        self.updateResultsFilters()
 
         self.worker.start()
+        self.updateMetrics()
+        self.metrics_timer.start()
+
+    def generationTarget(self, requirements):
+        """本次生成使用的服务、模型、Base URL 与 Key；选择 auto 时按需求规模自动选择，reason 为选择说明"""
+        service = self.service_combo.currentText()
+        if service != AUTO_SERVICE:
+            return {"service": service, "model": self.model_combo.currentText(),
+                    "base_url": self.base_url_input.text(), "api_key": self.api_key_input.text(), "reason": ""}
+        candidate, reason = route_request(self.config, requirements, self.system_prompt_input.toPlainText())
+        print(f"自动选择 {candidate['service']}/{candidate['model']}：{reason}")
+        return dict(candidate, reason=reason)
+
+    def buildHedgeConfig(self, target):
+        """根据 config.json 的 hedging 节构造对冲参数，未启用或备用模型不可用时返回 None"""
+        if not self.hedging_check.isChecked():
+            return None
+        return build_hedge_config(self.config, target["service"], target["model"], target["api_key"])
+
+    def selectedFormats(self):
+        return [output_format for output_format, check in self.format_checks.items() if check.isChecked()]
+
+    def selectedColumns(self):
+        return select_columns(self.include_id.isChecked(), self.include_priority.isChecked(),
+                              self.include_precondition.isChecked())
+
+    def closeLiveSink(self):
+        """关闭实时 JSONL 输出，返回其路径；本次未启用时返回 None"""
+        live_sink = getattr(self, "live_sink", None)
+        if live_sink is None:
+            return None
+        self.live_sink = None
+        return live_sink.close()
 
     def validateInputs(self):
         """验证输入内容"""
         errors = []
 
-        if not self.api_key_input.text().strip():
-            errors.append("API Key不能为空")
+        if self.service_combo.currentText() == AUTO_SERVICE:
+            if not routing_candidates(self.config):
+                errors.append("自动选择模型需要在 config.json 的 routing.candidates 中配置带 API Key 的候选模型")
+        else:
+            if not self.api_key_input.text().strip():
+                errors.append("API Key不能为空")
 
-        if not self.base_url_input.text().strip():
-            errors.append("Base URL不能为空")
+            if not self.base_url_input.text().strip():
+                errors.append("Base URL不能为空")
 
-        if not self.requirements_input.toPlainText().strip():
+        if self.import_task is not None:
+            errors.append("需求文件仍在读取中，请等待导入完成")
+        elif self.imported_requirements is None and not self.requirements_input.toPlainText().strip():
             errors.append("需求内容不能为空")
 
         if not self.model_combo.currentText():
             errors.append("请选择模型")
 
+        if self.isExporting(self.output_path.text()):
+            errors.append("上一次生成的结果仍在导出到该路径，请等待导出完成或更换输出路径")
+
+        if not self.selectedFormats():
+            errors.append("请至少选择一种输出格式")
+        elif "parquet" in self.selectedFormats() and importlib.util.find_spec("pyarrow") is None:
+            errors.append("导出 Parquet 需要安装 pyarrow：pip install pyarrow")
+
         return errors
 
+    def updateCacheBypassEnabled(self):
+        """响应缓存与增量生成都未启用时，“跳过响应缓存”没有意义"""
+        self.cache_bypass_check.setEnabled(self.response_cache is not None or self.incremental_check.isChecked())
+
+    def cancelGeneration(self):
+        """取消进行中的生成，已解析的用例在任务结束后仍可导出"""
+        self.cancel_btn.setEnabled(False)
+        self.statusBar.showMessage("正在取消...")
+        self.worker.generator.cancel()
+
+    def closeEvent(self, event):
+        """关闭窗口时取消进行中的生成，避免退出时等待任务结束"""
+        worker = getattr(self, "worker", None)
+        if worker is not None and worker.isRunning():
+            worker.generator.cancel()
+        super().closeEvent(event)
+
+    def isCancelled(self):
+        worker = getattr(self, "worker", None)
+        return worker is not None and worker.generator.cancelled
+
+    def resetGenerateButtons(self):
+        """恢复空闲状态的按钮与进度条"""
+        self.generate_btn.setEnabled(True)
+        self.generate_btn.setText("🚀 开始生成测试用例")
+        self.cancel_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+
     def handleTestCases(self, test_cases):
-        """处理生成的测试用例"""
-        try:
-            if isinstance(test_cases, dict) and "test_cases" in test_cases:
-                test_cases_list = test_cases["test_cases"]
-            elif isinstance(test_cases, list):
-                test_cases_list = test_cases
-            else:
-                QMessageBox.warning(self, "警告", "API返回的数据格式不符合预期，尝试处理...")
-                test_cases_list = [test_cases]
-
-            data = []
-            for idx, case in enumerate(test_cases_list, 1):
-                directory = case.get("directory", "未分类模块")
-                if isinstance(case.get("steps", []), list):
-                    # 检查步骤是否已经包含序号（以"1. "、"2. "等开头）
-                    def is_step_with_number(step):
-                        step = step.strip()
-                        # 检查是否以"数字. "或"数字、 "开头
-                        import re
-                        return bool(re.match(r'^\d+[.\、]\s', step))
-
-                    # 如果步骤已经有序号，直接使用；否则添加序号
-                    if is_step_with_number(case["steps"][0]):
-                        steps = "\n".join(case["steps"])
-                    else:
-                        steps = "\n".join([f"{i + 1}. {step}" for i, step in enumerate(case["steps"])])
-                else:
-                    steps = str(case.get("steps", ""))
-                priority = case.get("priority", "P1")
-
-                data.append({
-                    "用例ID": f"TC-{idx:03d}",
-                    "模块": directory,
-                    "用例标题": case.get("title", f"未命名用例{idx}"),
-                    "前置条件": case.get("precondition", ""),
-                    "测试步骤": steps,
-                    "预期结果": case.get("expected_result", ""),
-                    "优先级": priority,
-                    "测试结果": "",
-                    "备注": ""
-                })
-
-            df = pd.DataFrame(data)
-
-            if not self.include_id.isChecked():
-                df = df.drop("用例ID", axis=1)
-            if not self.include_priority.isChecked():
-                df = df.drop("优先级", axis=1)
-            if not self.include_precondition.isChecked():
-                df = df.drop("前置条件", axis=1)
-
-            output_path = self.output_path.text()
-            if not output_path.endswith('.xlsx'):
-                output_path += '.xlsx'
-            df.to_excel(output_path, index=False)
-
-            QMessageBox.information(
-                self,
-                "成功",
-                f"已生成 {len(test_cases_list)} 个测试用例并保存到：\n{output_path}"
-            )
+        """处理生成的测试用例：规范化、去重与导出交给后台导出任务，界面随即可以开始下一次生成"""
+        self.stopMetrics()
+        self.closeLiveSink()
+        self.resetGenerateButtons()
+        self.statusBar.showMessage(self.readyMessage())
+        test_cases_list, expected_format = extract_case_list(test_cases)
+        if self.isCancelled():
+            if not test_cases_list:
+                QMessageBox.information(self, "已取消", "生成已取消，尚未解析出完整的测试用例。")
+                return
+            answer = QMessageBox.question(
+                self, "已取消",
+                f"生成已取消，已完整解析 {len(test_cases_list)} 个测试用例，是否导出？",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer != QMessageBox.Yes:
+                return
+        elif not expected_format:
+            QMessageBox.warning(self, "警告", "API返回的数据格式不符合预期，尝试处理...")
+
+        # JSONL 在生成过程中已实时写入，这里按去重后的最终结果重写
+        self.startExport(test_cases_list, self.output_path.text(), dedup=self.dedup_check.isChecked(),
+                         validation_report=self.config["output"].get("validation_report", True),
+                         source=getattr(self, "worker", None))
+
+    def startExport(self, test_cases_list, output_path, dedup=False, validation_report=False, source=None):
+        """按“输出设置”中的格式与列启动后台导出任务
+
+        source 为产生这些用例的生成任务，导出完成时若没有开始新的生成，结果表格换成最终结果；
+        导出当前显示的用例时为 None。
+        """
+        task = ExportTask(
+            test_cases_list, output_path,
+            formats=self.selectedFormats(),
+            include_id=self.include_id.isChecked(),
+            include_priority=self.include_priority.isChecked(),
+            include_precondition=self.include_precondition.isChecked(),
+            split_by_module=self.split_by_module.isChecked(),
+            batch_size=self.config["output"].get("batch_size", DEFAULT_BATCH_SIZE),
+            dedup_threshold=(self.config["output"].get("dedup_threshold", DEFAULT_DEDUP_THRESHOLD)
+                             if dedup else None),
+            validation_report=validation_report)
+        task.source = source
+        task.stage.connect(self.updateExportStage)
+        task.progress.connect(self.updateExportProgress)
+        task.finished.connect(lambda result, task=task: self.handleExportFinished(task, result))
+        task.error.connect(lambda message, task=task: self.handleExportError(task, message))
+        self.export_tasks.append(task)
+        self.export_progress.setRange(0, 0)
+        self.export_progress.setFormat("正在导出...")
+        self.export_progress.setVisible(True)
+        task.start()
+
+    def updateExportStage(self, message):
+        """导出任务进入新阶段；生成进行中时状态栏留给生成进度"""
+        self.export_progress.setToolTip(message)
+        if not self.isGenerating():
+            self.statusBar.showMessage(message)
+
+    def updateExportProgress(self, written, total, size):
+        """显示导出进度：已写入行数（按全部格式累计）与已写入磁盘的数据量"""
+        self.export_progress.setRange(0, max(total, 1))
+        self.export_progress.setValue(written)
+        self.export_progress.setFormat(f"导出 {written}/{total} 行 · {size / 1024 / 1024:.1f} MB")
+
+    def finishExport(self, task):
+        """导出任务结束：没有其他导出任务时隐藏导出进度"""
+        if task in self.export_tasks:
+            self.export_tasks.remove(task)
+        if not self.export_tasks:
+            self.export_progress.setVisible(False)
+        if not self.isGenerating():
+            self.statusBar.showMessage(self.readyMessage())
+
+    def handleExportFinished(self, task, result):
+        """导出完成：更新结果表格并提示保存路径"""
+        self.finishExport(task)
+        test_cases_list = result["cases"]
+        output_path = "\n".join(result["outputs"])
+        if task.source is None:
+            QMessageBox.information(self, "成功", f"已导出 {len(test_cases_list)} 个测试用例到：\n{output_path}")
+            return
+        if task.source is self.worker:
+            self.results_model.setCases(test_cases_list)
+            self.updateResultsFilters()
+
+        dedup_note = f"（已去除 {result['removed']} 个近似重复用例）" if result["removed"] else ""
+        validation_note = ""
+        if result["report_path"]:
+            validation_note = f"\n\n{result['report'].summary_text()}，详见校验报告：\n{result['report_path']}"
+        message = f"已生成 {len(test_cases_list)} 个测试用例{dedup_note}并保存到：\n{output_path}{validation_note}"
+        failed_sections = task.source.generator.failed_sections
+        if failed_sections:
+            # 部分需求没有生成用例，必须明确提示，不能当作完整结果
+            failures = "\n".join(f"- 第 {failure['section']} 部分（{failure['heading']}）：{failure['error']}"
+                                  for failure in failed_sections)
+            QMessageBox.warning(
+                self, "部分完成",
+                f"{message}\n\n以下 {len(failed_sections)} 个需求部分生成失败，结果中不包含这些部分的用例，"
+                f"请重新生成：\n{failures}")
+            return
+        QMessageBox.information(self, "成功", message)
 
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存测试用例时出错：{str(e)}")
+    def handleExportError(self, task, message):
+        self.finishExport(task)
+        QMessageBox.critical(self, "错误", f"保存测试用例时出错：{message}")
 
-        finally:
-            self.generate_btn.setEnabled(True)
-            self.generate_btn.setText("🚀 开始生成测试用例")
-            self.progress_bar.setVisible(False)
-            self.progress_bar.setRange(0, 100)
-            self.progress_bar.setValue(0)
-            self.statusBar.showMessage("就绪")
+    def isGenerating(self):
+        worker = getattr(self, "worker", None)
+        return worker is not None and worker.isRunning()
+
+    def isExporting(self, output_path):
+        """是否有导出任务正在写入该输出路径"""
+        return any(os.path.splitext(task.output_path)[0] == os.path.splitext(output_path)[0]
+                   for task in self.export_tasks)
 
     def handleError(self, error_msg):
         """处理错误，提供更友好的错误信息"""
+        self.stopMetrics()
+        live_path = self.closeLiveSink()
+        if self.isCancelled():
+            # 取消时连接被主动关闭，由此产生的异常不提示
+            self.resetGenerateButtons()
+            self.statusBar.showMessage("已取消")
+            return
         error_mapping = {
             "401": ("API密钥无效或权限不足", "请检查API密钥是否正确，或是否具有访问权限"),
             "402": ("账户余额不足", "请充值或检查账户余额"),
@@ -664,17 +1021,130 @@ class TestGeneratorGUI(QMainWindow):
             else:
                 display_msg = f"发生错误：\n{error_msg}"
 
+        if live_path and self.parsed_case_count:
+            display_msg += f"\n\n已解析的 {self.parsed_case_count} 个用例已保存到：\n{live_path}"
         QMessageBox.critical(self, "错误", display_msg)
 
-        self.generate_btn.setEnabled(True)
-        self.generate_btn.setText("🚀 开始生成测试用例")
-        self.progress_bar.setVisible(False)
+        self.resetGenerateButtons()
         self.statusBar.showMessage("出错")
 
+    def readyMessage(self):
+        """空闲时的状态栏文字，启用缓存时附带命中统计"""
+        if self.response_cache is None:
+            return "就绪"
+        hits, misses = self.response_cache.stats()
+        return f"就绪 | 响应缓存 命中 {hits} 次 / 未命中 {misses} 次"
+
     def updateProgress(self, message):
         """更新进度信息"""
         self.statusBar.showMessage(message)
 
+    def updateMetrics(self):
+        """在状态栏右侧显示当前任务的实时指标"""
+        worker = getattr(self, "worker", None)
+        if worker is not None:
+            self.metrics_label.setText(worker.generator.metrics.status_text())
+
+    def stopMetrics(self):
+        """任务结束：停止刷新，保留最终指标，并显示尚未加入结果表格的用例"""
+        self.metrics_timer.stop()
+        self.updateMetrics()
+        self.flushParsedCases()
+
+    def onCaseParsed(self, case):
+        """流式解析出单个用例：先放入缓冲区，由定时器按批加入结果表格"""
+        self.parsed_case_count += 1
+        self.pending_cases.append(case)
+
+    def flushParsedCases(self):
+        """把缓冲的用例一次性追加到结果表格，并更新状态栏"""
+        if not self.pending_cases:
+            return
+        cases, self.pending_cases = self.pending_cases, []
+        self.results_model.appendCases(cases)
+        self.updateResultsFilters()
+        if self.worker.isRunning():
+            self.statusBar.showMessage(f"正在接收数据，已解析 {self.parsed_case_count} 个测试用例...")
+
+    def updateResultsFilters(self):
+        """模块下拉框补充新出现的模块，保留当前选择"""
+        modules = self.results_model.modules()
+        if len(modules) != self.module_filter.count() - 1:
+            current = self.module_filter.currentText()
+            self.module_filter.blockSignals(True)
+            self.module_filter.clear()
+            self.module_filter.addItem("全部模块")
+            self.module_filter.addItems(modules)
+            index = self.module_filter.findText(current)
+            self.module_filter.setCurrentIndex(max(index, 0))
+            self.module_filter.blockSignals(False)
+            if index < 0:
+                self.applyResultsFilter()
+        self.updateResultsCount()
+
+    def applyResultsFilter(self):
+        """按模块、优先级与标题关键字筛选结果表格"""
+        self.results_model.setFilter(
+            module=self.module_filter.currentText() if self.module_filter.currentIndex() > 0 else None,
+            priority=self.priority_filter.currentText() if self.priority_filter.currentIndex() > 0 else None,
+            keyword=self.keyword_filter.text())
+        self.updateResultsCount()
+
+    def updateResultsCount(self):
+        shown, total = self.results_model.rowCount(), self.results_model.totalCount()
+        self.results_count_label.setText(f"显示 {shown} / 共 {total} 条")
+        self.export_visible_btn.setEnabled(shown > 0)
+
+    def exportVisibleCases(self):
+        """按当前筛选与排序导出结果表格中显示的用例，格式与列使用“输出设置”中的选择"""
+        formats = self.selectedFormats()
+        if not formats:
+            QMessageBox.warning(self, "输入验证", "请在“输出设置”中至少选择一种输出格式")
+            return
+        default_path = os.path.splitext(self.output_path.text())[0] + "_当前显示.xlsx"
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "导出当前显示的用例", default_path,
+            "Excel文件 (*.xlsx);;JSONL文件 (*.jsonl);;CSV文件 (*.csv);;Parquet文件 (*.parquet);;所有文件 (*.*)")
+        if not filename:
+            return
+        if self.isExporting(filename):
+            QMessageBox.warning(self, "输入验证", "上一次导出仍在写入该路径，请等待导出完成或更换文件名")
+            return
+        # 生成过程中表格里是尚未规范化的原始用例，导出任务会先统一规范化（对最终结果无影响）
+        self.startExport(self.results_model.visibleCases(), filename)
+
+
+def config_path():
+    """config.json 的路径（打包后位于解包目录中）"""
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, 'config.json')
+
+
+def read_config():
+    """读取 config.json，文件不存在或格式错误时抛出异常"""
+    with open(config_path(), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def prewarm():
+    """预热：读取配置并导入生成、导出时才加载的依赖，可在后台线程中调用
+
+    返回读取到的配置（读取失败时为 None），传给 TestGeneratorGUI(config=...) 即可跳过文件读取。
+    """
+    try:
+        config = read_config()
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = None
+    for name in PREWARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"预加载 {name} 失败: {e}")
+    return config
+
 
 def create_and_show_gui():
     """创建并显示GUI窗口（供外部调用）"""
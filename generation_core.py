@@ -0,0 +1,476 @@
+"""测试用例生成核心逻辑
+
+界面的 GenerationTask 与命令行批处理共用同一套生成流程。
+所有流式调用都在共享的生成引擎（generation_engine）中执行，受全局并发上限约束。
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from requirement_splitter import estimate_tokens, split_requirements
+from section_history import SectionHistory, scope_key, DEFAULT_HISTORY_DIR, DEFAULT_MAX_AGE_DAYS, DEFAULT_UNIT_TOKENS
+from streaming import GenerationError, StreamAttempt
+from hedging import hedge_delay, run_hedged
+from response_cache import cache_key
+from rate_limit import get_limiter
+from token_budget import estimate_max_tokens, output_limit, default_history, scale_case_quota, SAFETY_FACTOR
+from model_router import choose_model, default_stats, DEFAULT_SMALL_JOB_TOKENS
+from telemetry import RunMetrics, append_metrics_log, DEFAULT_METRICS_LOG
+import client_pool
+
+# 需求分块的默认 token 预算与并发数，可在 config.json 的 generation 节中修改
+DEFAULT_CHUNK_MAX_TOKENS = 6000
+DEFAULT_MAX_WORKERS = 4
+# 对冲请求：主模型首字延迟超过该秒数（或其观测 p95）时向备用模型发起同样的请求
+DEFAULT_HEDGE_THRESHOLD_SECONDS = 20
+# 输出因长度上限被截断时最多续写的次数，以及续写请求中携带的已输出用例数
+DEFAULT_MAX_CONTINUATIONS = 3
+CONTINUATION_TAIL_CASES = 5
+CONTINUATION_PROMPT = ("上面的输出因长度限制被截断，此前已完整输出 {count} 个测试用例。"
+                       "请继续输出剩余的测试用例：直接输出一个新的 JSON 数组，只包含尚未输出的用例，"
+                       "不要重复已输出的用例，每个用例的格式与之前完全相同。")
+
+# AI 服务名称与 config.json 中 api 配置节的对应关系，DeepSeek 使用 api 节本身
+SERVICE_CONFIG_KEYS = {
+    "DeepSeek": None,
+    "MiMo": "mimo",
+    "智普AI": "zhipu",
+    "Kimi": "kimi",
+    "MiniMax": "minimax",
+    "腾讯混元": "tencent",
+}
+
+
+def service_config(config, service):
+    """返回 AI 服务在 config.json 中对应的配置节"""
+    key = SERVICE_CONFIG_KEYS.get(service)
+    return config["api"] if key is None else config["api"][key]
+
+
+def build_hedge_config(config, service, model, api_key):
+    """根据 config.json 的 hedging 节构造对冲参数，备用模型不可用时返回 None
+
+    service/model/api_key 为当前主请求使用的服务、模型与 Key。
+    """
+    hedging_config = config.get("hedging", {})
+    secondary_service = hedging_config.get("secondary_service", "DeepSeek")
+    if secondary_service not in SERVICE_CONFIG_KEYS:
+        print(f"未知的备用服务: {secondary_service}，已禁用对冲请求")
+        return None
+    secondary_config = service_config(config, secondary_service)
+    secondary_model = hedging_config.get("secondary_model") or secondary_config["default_model"]
+
+    secondary_key = hedging_config.get("secondary_api_key", "")
+    if not secondary_key and secondary_service == service:
+        secondary_key = api_key
+    if not secondary_key:
+        print(f"未配置备用服务 {secondary_service} 的 API Key，已禁用对冲请求")
+        return None
+
+    if secondary_service == service and secondary_model == model:
+        print("备用模型与当前模型相同，已禁用对冲请求")
+        return None
+
+    return {
+        "service_type": secondary_service,
+        "base_url": secondary_config["base_url"],
+        "model": secondary_model,
+        "api_key": secondary_key,
+        "threshold_seconds": hedging_config.get("threshold_seconds", DEFAULT_HEDGE_THRESHOLD_SECONDS),
+        "use_observed_p95": hedging_config.get("use_observed_p95", True),
+    }
+
+
+def routing_candidates(config):
+    """config.json 的 routing.candidates 中配置了 API Key 的候选，补全 base_url 与默认模型"""
+    candidates = []
+    for item in config.get("routing", {}).get("candidates", []):
+        service = item.get("service")
+        if service not in SERVICE_CONFIG_KEYS:
+            print(f"自动选择的候选服务未知，已忽略: {service}")
+            continue
+        api_config = service_config(config, service)
+        api_key = item.get("api_key") or api_config.get("api_key", "")
+        if not api_key:
+            continue
+        candidate = dict(item, service=service, api_key=api_key)
+        candidate["model"] = item.get("model") or api_config["default_model"]
+        candidate["base_url"] = item.get("base_url") or api_config["base_url"]
+        candidates.append(candidate)
+    return candidates
+
+
+def route_request(config, requirements, system_prompt):
+    """为一次生成自动选择服务与模型，返回 (候选, 选择说明)；没有可用候选时抛出 GenerationError"""
+    candidates = routing_candidates(config)
+    if not candidates:
+        raise GenerationError("自动选择模型需要在 config.json 的 routing.candidates 中配置带 API Key 的候选模型")
+    routing_config = config.get("routing", {})
+    generation_config = config.get("generation", {})
+    limits_config = config.get("output_limits", {})
+
+    def output_tokens(candidate):
+        limit = output_limit(limits_config, candidate["service"], candidate["model"])
+        return estimate_max_tokens(requirements, system_prompt, candidate["model"], limit) / SAFETY_FACTOR
+
+    return choose_model(candidates, estimate_tokens(requirements), output_tokens,
+                        section_tokens=generation_config.get("chunk_max_tokens", DEFAULT_CHUNK_MAX_TOKENS),
+                        small_job_tokens=routing_config.get("small_job_tokens", DEFAULT_SMALL_JOB_TOKENS))
+
+
+def section_heading(section, max_chars=40):
+    """需求部分的首个非空行，用于在提示中指明是哪一部分"""
+    line = next((line.strip() for line in section.splitlines() if line.strip()), "")
+    return line if len(line) <= max_chars else line[:max_chars] + "…"
+
+
+class TestCaseGenerator:
+    """一次测试用例生成任务
+
+    on_case(case) 在每个用例解析完成时调用，on_progress(message) 用于报告进度；
+    两者都可能在生成引擎或任务线程中被调用。generate() 返回合并后的用例列表，
+    失败时抛出 GenerationError（面向用户的错误）或底层调用异常。
+    metrics 为本次任务的实时指标，可在其他线程中读取；任务结束后追加到 metrics_log。
+    cancel() 可从其他线程调用，此时 generate() 提前结束并返回已完整解析的用例。
+    多个需求部分中只有一部分失败时 generate() 仍返回其余部分的用例，失败的部分记录在
+    failed_sections 中（{"section": 序号, "heading": 首行, "error": 错误信息}），调用方应提示用户。
+    """
+
+    def __init__(self, api_key, base_url, model, system_prompt, user_prompt, requirements, service_type,
+                 chunk_max_tokens=DEFAULT_CHUNK_MAX_TOKENS, max_workers=DEFAULT_MAX_WORKERS, hedge=None,
+                 cache=None, cache_bypass=False, rate_limits=None, retry=None, output_limits=None,
+                 adaptive_max_tokens=True, incremental=None, metrics_log=DEFAULT_METRICS_LOG,
+                 max_continuations=DEFAULT_MAX_CONTINUATIONS, sections=None, on_case=None, on_progress=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.system_prompt = system_prompt
+        self.user_prompt = user_prompt
+        self.requirements = requirements
+        self.sections = sections  # 已按标题切分好的需求章节（从文件导入时），为 None 时从 requirements 切分
+        self.service_type = service_type  # "DeepSeek", "MiMo", "智普AI", "Kimi" 或 "MiniMax"
+        self.chunk_max_tokens = chunk_max_tokens
+        self.max_workers = max_workers
+        # 对冲配置：{"service_type", "base_url", "model", "api_key", "threshold_seconds", "use_observed_p95"}
+        self.hedge = hedge
+        self.hedge_client = None
+        self.cache = cache
+        self.cache_bypass = cache_bypass  # 跳过读取缓存，但仍写入最新结果
+        self.rate_limits = rate_limits or {}  # config.json 的 rate_limits 节，按服务名限速
+        self.retry = retry  # config.json 的 retry 节
+        self.output_limits = output_limits or {}  # config.json 的 output_limits 节，按模型/服务名的 max_tokens 上限
+        self.adaptive_max_tokens = adaptive_max_tokens  # 关闭时直接使用上限
+        self.incremental = incremental  # config.json 的 incremental 节，为 None 时不使用章节历史
+        self.metrics_log = metrics_log  # 为 None 时不写指标日志
+        self.max_continuations = max_continuations  # 为 0 时不续写
+        self.metrics = RunMetrics()
+        self._forward_case = on_case or (lambda case: None)
+        self.on_progress = on_progress or (lambda message: None)
+        self.cancelled = False
+        self.failed_sections = []
+        self.requirement_tokens = None  # 整份需求的 token 数，拆分为多次请求时用于按占比分配用例数
+        self._attempts = []
+        self._attempts_lock = threading.Lock()
+
+    def cancel(self):
+        """取消生成：中止所有进行中的流式调用并关闭连接，尚未开始的分块不再调用API"""
+        with self._attempts_lock:
+            self.cancelled = True
+            attempts = list(self._attempts)
+        for attempt in attempts:
+            attempt.cancel()
+
+    def _track(self, attempt):
+        """登记一次流式调用，以便 cancel() 时中止；已取消时立即中止"""
+        with self._attempts_lock:
+            self._attempts.append(attempt)
+            cancelled = self.cancelled
+        if cancelled:
+            attempt.cancel()
+        return attempt
+
+    def on_case(self, case):
+        """每个用例解析完成（或从缓存、章节历史复用）时调用"""
+        self.metrics.record_case()
+        self._forward_case(case)
+
+    def generate(self):
+        status, error = "ok", None
+        try:
+            return self._generate()
+        except Exception as e:
+            status, error = "failed", str(e)
+            raise
+        finally:
+            if self.cancelled:
+                status = "cancelled"
+            self.metrics.finish()
+            if self.metrics_log:
+                record = {
+                    "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "service": self.service_type,
+                    "model": self.model,
+                    "status": status,
+                    "error": error,
+                }
+                record.update(self.metrics.snapshot())
+                append_metrics_log(record, self.metrics_log)
+
+    def _generate(self):
+        self.on_progress("正在初始化API客户端...")
+        client = client_pool.get_client(self.base_url, self.api_key)
+        if self.hedge:
+            self.hedge_client = client_pool.get_client(self.hedge["base_url"], self.hedge["api_key"])
+        if self.sections is not None:
+            self.requirement_tokens = sum(estimate_tokens(section) for section in self.sections)
+        else:
+            self.requirement_tokens = estimate_tokens(self.requirements)
+        if self.incremental is not None:
+            return self.generate_incremental(client)
+
+        sections = split_requirements(self.requirements, self.chunk_max_tokens, self.sections)
+        if len(sections) == 1:
+            self.on_progress("正在调用API，请稍候...")
+            test_cases = self.generate_section(client, sections[0])
+            self.on_progress("API响应接收完成，正在解析...")
+            return test_cases
+        return self.generate_sections(client, sections)
+
+    def generate_incremental(self, client):
+        """对照章节历史，只为修改过或新增的章节调用API，未变化的章节复用上次的用例"""
+        history = SectionHistory(
+            scope_key(self.base_url, self.service_type, self.model, self.system_prompt, self.user_prompt),
+            directory=self.incremental.get("directory") or DEFAULT_HISTORY_DIR,
+            max_age_seconds=self.incremental.get("max_age_days", DEFAULT_MAX_AGE_DAYS) * 86400,
+        )
+        # 默认约为一个章节，只修改一个章节时只需重新生成它所在的单元；为 0 时与分块预算相同
+        unit_tokens = self.incremental.get("unit_tokens", DEFAULT_UNIT_TOKENS) or self.chunk_max_tokens
+        unit_tokens = min(unit_tokens, self.chunk_max_tokens)
+        units = history.plan(self.requirements, unit_tokens, reuse=not self.cache_bypass, sections=self.sections)
+        pending = [unit for unit in units if not unit.reused]
+        self.on_progress(f"需求共 {len(units)} 个部分，{len(units) - len(pending)} 个未变化（复用已有用例），"
+                         f"{len(pending)} 个需要重新生成")
+        for unit in units:
+            if unit.reused:
+                for case in unit.cases:
+                    self.on_case(case)
+
+        # 单个章节超出分块预算时仍需再切分，一个单元可能对应多次调用
+        chunks = []
+        owners = []
+        for unit in pending:
+            for chunk in split_requirements(unit.text, self.chunk_max_tokens):
+                chunks.append(chunk)
+                owners.append(unit)
+        # 有复用的单元时，待生成的部分即使全部失败也返回已复用的用例，失败的部分记录在 failed_sections 中
+        partial = len(pending) < len(units)
+        if len(chunks) == 1:
+            self.on_progress("正在调用API，请稍候...")
+            try:
+                results = [self.generate_section(client, chunks[0])]
+            except Exception as e:
+                if not partial:
+                    raise
+                self._record_failure(0, chunks[0], e)
+                results = [None]
+        elif chunks:
+            results = self.generate_concurrently(client, chunks, allow_all_failed=partial)
+        else:
+            results = []
+
+        failed = set()
+        for unit, cases in zip(owners, results):
+            if cases is None:
+                failed.add(id(unit))
+            else:
+                unit.cases = (unit.cases or []) + cases
+        if not self.cancelled:
+            # 取消时各单元的用例可能不完整，不写入历史
+            history.update([unit for unit in units if id(unit) not in failed])
+        return [case for unit in units if unit.cases for case in unit.cases]
+
+    def generate_sections(self, client, sections):
+        """并发生成多个需求分块，按分块原始顺序合并结果"""
+        results = self.generate_concurrently(client, sections)
+        return [case for cases in results if cases for case in cases]
+
+    def generate_concurrently(self, client, sections, allow_all_failed=False):
+        """并发生成多个需求分块，返回与分块一一对应的用例列表，失败的分块为 None
+
+        全部分块均失败时抛出 GenerationError；allow_all_failed 为 True 时仍正常返回。
+        """
+        workers = max(1, min(self.max_workers, len(sections)))
+        self.on_progress(f"需求已拆分为 {len(sections)} 个部分，正在以 {workers} 路并发生成...")
+
+        results = [None] * len(sections)
+        errors = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.generate_section, client, section): index
+                       for index, section in enumerate(sections)}
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    errors.append(f"第 {index + 1} 部分: {str(e)}")
+                    self._record_failure(index, sections[index], e)
+                self.on_progress(f"已完成 {done}/{len(sections)} 个需求部分...")
+
+        if errors and len(errors) == len(sections) and not allow_all_failed:
+            raise GenerationError("所有需求部分均生成失败：\n" + "\n".join(errors))
+        self.failed_sections.sort(key=lambda failure: failure["section"])
+        return results
+
+    def _record_failure(self, index, section, error):
+        self.failed_sections.append({"section": index + 1, "heading": section_heading(section), "error": str(error)})
+        self.on_progress(f"第 {index + 1} 部分（{section_heading(section)}）生成失败，已跳过: {str(error)}")
+
+    def build_api_params(self, requirements, service_type=None, model=None):
+        """根据服务类型构造 chat.completions 请求参数，默认使用当前选择的服务与模型"""
+        service_type = service_type or self.service_type
+        model = model or self.model
+        if self.user_prompt == '':
+            tips = ""
+        else:
+            tips = "补充说明："
+        formatted_prompt = tips + self.user_prompt + ',\n需求如下：\n' + requirements
+        system_prompt = self.system_prompt
+        if self.requirement_tokens:
+            # 只包含部分需求的请求按其占比要求用例数，各部分合计与整份需求的要求一致
+            system_prompt = scale_case_quota(system_prompt, estimate_tokens(requirements) / self.requirement_tokens)
+
+        max_tokens = output_limit(self.output_limits, service_type, model)
+        if self.adaptive_max_tokens:
+            max_tokens = estimate_max_tokens(requirements, system_prompt, model, max_tokens)
+
+        api_params = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": formatted_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+
+        if service_type == "MiMo":
+            api_params["extra_body"] = {"thinking": {"type": "disabled"}}
+            api_params["temperature"] = 0.3
+            api_params["top_p"] = 0.95
+        elif service_type == "智普AI":
+            api_params["extra_body"] = {"thinking": {"type": "enabled"}}
+            api_params["temperature"] = 0.7
+        elif service_type == "Kimi":
+            api_params["temperature"] = 0.6
+            api_params["top_p"] = 0.95
+        elif service_type == "MiniMax":
+            api_params["temperature"] = 0.4
+            api_params["top_p"] = 0.9
+            # MiniMax特定参数
+            api_params["extra_body"] = {
+                "tokens_to_generate": max_tokens,
+                "skip_unknown_tokens": True,
+                "thinking": {"type": "disabled"}
+            }
+        elif service_type == "腾讯混元":
+            # 腾讯混元模型参数配置
+            api_params["temperature"] = 0.5
+            api_params["top_p"] = 0.9
+
+        return api_params
+
+    def generate_section(self, client, requirements):
+        """对一段需求发起一次流式调用（启用对冲时可能是两路），返回解析出的用例列表"""
+        if self.cancelled:
+            return []
+        api_params = self.build_api_params(requirements)
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.base_url, api_params)
+            if not self.cache_bypass:
+                cached_cases = self.cache.get(key)
+                if cached_cases:
+                    for case in cached_cases:
+                        self.on_case(case)
+                    return cached_cases
+
+        primary = self._track(StreamAttempt(client, api_params, on_case=self.on_case,
+                                            label=f"{self.service_type}/{self.model}",
+                                            limiter=get_limiter(self.service_type, self.rate_limits),
+                                            retry_config=self.retry, on_progress=self.on_progress,
+                                            metrics=self.metrics))
+        if not self.hedge:
+            primary.run()
+            winner = primary
+        else:
+            winner = self.run_hedged(primary, requirements)
+        try:
+            test_cases = winner.result()
+        except Exception:
+            if not self.cancelled:
+                default_stats().record(winner.label, False, winner.ttft, input_tokens=estimate_tokens(requirements))
+            raise
+        output_tokens = winner.output_tokens
+        last = winner
+        for round_number in range(1, self.max_continuations + 1):
+            if not last.truncated or self.cancelled:
+                break
+            self.on_progress(f"{winner.label} 输出达到长度上限，已解析 {len(test_cases)} 个用例，"
+                             f"正在第 {round_number} 次续写...")
+            last = self.continue_attempt(winner, test_cases)
+            last.run()
+            try:
+                more_cases = last.result()
+            except Exception as e:
+                print(f"续写失败，保留已解析的 {len(test_cases)} 个用例: {e}")
+                break
+            test_cases = test_cases + more_cases
+            output_tokens += last.output_tokens
+            if not more_cases:
+                break
+        else:
+            if last.truncated:
+                print(f"已达到最大续写次数 {self.max_continuations}，输出可能仍不完整")
+
+        if self.cancelled:
+            # 部分结果不写入缓存，也不计入 token 用量统计
+            return test_cases
+        default_history().record(winner.api_params["model"], winner.api_params["max_tokens"],
+                                 output_tokens, len(test_cases))
+        default_stats().record(winner.label, True, winner.ttft, winner.tokens_per_second,
+                               estimate_tokens(requirements))
+
+        if key is not None:
+            self.cache.put(key, test_cases)
+        return test_cases
+
+    def continue_attempt(self, previous, test_cases):
+        """构造续写请求：在原对话后附上已输出内容的结尾（截至最后一个完整用例），要求模型输出剩余用例"""
+        tail = test_cases[-CONTINUATION_TAIL_CASES:]
+        tail_text = ",\n".join(json.dumps(case, ensure_ascii=False) for case in tail)
+        omitted = "...（前文省略）\n" if len(test_cases) > len(tail) else ""
+        params = dict(previous.api_params)
+        params["messages"] = previous.api_params["messages"][:2] + [
+            {"role": "assistant", "content": "[\n" + omitted + tail_text + ","},
+            {"role": "user", "content": CONTINUATION_PROMPT.format(count=len(test_cases))},
+        ]
+        return self._track(StreamAttempt(previous.client, params, on_case=self.on_case,
+                                         label=f"{previous.label} 续写", limiter=previous.limiter,
+                                         retry_config=self.retry, on_progress=self.on_progress,
+                                         metrics=self.metrics))
+
+    def run_hedged(self, primary, requirements):
+        """主请求首字过慢时向备用模型发起对冲请求，返回胜出的一路"""
+        def make_secondary():
+            params = self.build_api_params(requirements, self.hedge["service_type"], self.hedge["model"])
+            return self._track(StreamAttempt(self.hedge_client, params,
+                                             label=f"{self.hedge['service_type']}/{self.hedge['model']}",
+                                             limiter=get_limiter(self.hedge["service_type"], self.rate_limits),
+                                             retry_config=self.retry, on_progress=self.on_progress,
+                                             metrics=self.metrics))
+
+        delay = hedge_delay(primary.label, self.hedge["threshold_seconds"], self.hedge["use_observed_p95"])
+        return run_hedged(primary, make_secondary, delay,
+                          on_case=self.on_case, on_progress=self.on_progress)
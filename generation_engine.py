@@ -0,0 +1,135 @@
+"""共享的异步生成引擎
+
+进程内只有一个后台事件循环线程，所有 chat.completions 流式调用都以协程的形式在其中运行，
+使用 client_pool 中的异步客户端，几十路并发流只占用这一个线程，而不是每路一个阻塞线程。
+全局并发上限（network.max_concurrent_streams）对界面、命令行批处理、分块并发、对冲请求与续写
+一视同仁：超过上限的调用在引擎中排队，有名额空出时按到达顺序开始。
+
+分块、对冲、续写、缓存等编排逻辑仍是同步代码，在普通线程中执行：界面的生成、导出与需求导入
+通过 submit_job 在引擎的任务线程池中执行，并通过信号接收结果；命令行批处理按 --concurrency 使用
+自己的线程池，每个需求文件一个线程。一次生成内每个并发的需求分块另占一个线程（generation.max_workers），
+这些线程只等待引擎中的流结束，不占用网络连接。
+"""
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import client_pool
+
+DEFAULT_MAX_CONCURRENT_STREAMS = 16
+# 任务线程池的线程数，即界面同时执行的后台任务（生成、导出、需求导入）上限
+DEFAULT_MAX_JOBS = 8
+# 事件循环中域名解析等阻塞操作使用的线程数
+RESOLVER_THREADS = 4
+
+
+class GenerationEngine:
+    """后台事件循环线程，首次使用时启动，线程安全"""
+
+    def __init__(self, max_concurrent_streams=DEFAULT_MAX_CONCURRENT_STREAMS, max_jobs=DEFAULT_MAX_JOBS):
+        self.max_concurrent_streams = max(1, max_concurrent_streams)
+        self.max_jobs = max(1, max_jobs)
+        self.active_streams = 0
+        self.waiting_streams = 0
+        self._loop = None
+        self._thread = None
+        self._condition = None
+        self._jobs = None
+        self._lock = threading.Lock()
+
+    def configure(self, network_config):
+        """更新全局并发上限（config.json 的 network 节），对排队中的调用立即生效"""
+        self.max_concurrent_streams = max(1, network_config.get("max_concurrent_streams",
+                                                                self.max_concurrent_streams))
+        if self._loop is not None:
+            self.call_soon(self._notify_all)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="generation-engine",
+                                                daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._loop.set_default_executor(ThreadPoolExecutor(max_workers=RESOLVER_THREADS,
+                                                           thread_name_prefix="generation-engine-resolver"))
+        self._condition = asyncio.Condition()
+        ready.set()
+        self._loop.run_forever()
+
+    def submit(self, coroutine):
+        """在引擎线程中运行协程，返回 concurrent.futures.Future，可在任意线程中等待"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_started())
+
+    def call_soon(self, callback, *args):
+        """在引擎线程中执行回调（如取消某个协程），可从任意线程调用"""
+        self._ensure_started().call_soon_threadsafe(callback, *args)
+
+    def submit_job(self, func, *args):
+        """在任务线程池中执行一次生成任务（同步函数），返回 Future"""
+        with self._lock:
+            if self._jobs is None:
+                self._jobs = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="generation-job")
+            return self._jobs.submit(func, *args)
+
+    @asynccontextmanager
+    async def stream_slot(self, on_wait=None):
+        """占用一个全局并发名额，直到退出上下文；需要排队时先调用 on_wait()"""
+        condition = self._condition
+        async with condition:
+            if self.active_streams >= self.max_concurrent_streams and on_wait is not None:
+                on_wait()
+            self.waiting_streams += 1
+            try:
+                await condition.wait_for(lambda: self.active_streams < self.max_concurrent_streams)
+            finally:
+                self.waiting_streams -= 1
+            self.active_streams += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.active_streams -= 1
+                condition.notify()
+
+    def _notify_all(self):
+        async def notify():
+            async with self._condition:
+                self._condition.notify_all()
+        self._loop.create_task(notify())
+
+    def shutdown(self):
+        """关闭全部异步客户端并停止事件循环线程"""
+        with self._lock:
+            loop, thread, jobs = self._loop, self._thread, self._jobs
+            self._loop = self._thread = self._jobs = None
+        if jobs is not None:
+            jobs.shutdown(wait=False, cancel_futures=True)
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client_pool.default_pool.aclose(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"关闭API客户端失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+_default_engine = GenerationEngine()
+atexit.register(_default_engine.shutdown)
+
+
+def default_engine():
+    return _default_engine
+
+
+def configure(network_config):
+    _default_engine.configure(network_config)
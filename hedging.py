@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque
+
+# 每个模型保留的首字延迟样本数，以及计算 p95 所需的最少样本数
+TTFT_HISTORY_SIZE = 50
+MIN_SAMPLES_FOR_P95 = 5
+
+_ttft_history = {}
+_ttft_lock = threading.Lock()
+
+
+def record_ttft(key, seconds):
+    """记录一次首字延迟（time-to-first-token）样本，None 被忽略"""
+    if seconds is None:
+        return
+    with _ttft_lock:
+        _ttft_history.setdefault(key, deque(maxlen=TTFT_HISTORY_SIZE)).append(seconds)
+
+
+def observed_p95(key):
+    """返回该模型观测到的首字延迟 p95，样本不足时返回 None"""
+    with _ttft_lock:
+        samples = sorted(_ttft_history.get(key, ()))
+    if len(samples) < MIN_SAMPLES_FOR_P95:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def hedge_delay(key, threshold_seconds, use_observed_p95=True):
+    """主请求等待首字的最长时间：配置阈值与观测 p95 中较小者"""
+    if use_observed_p95:
+        p95 = observed_p95(key)
+        if p95 is not None:
+            return min(threshold_seconds, p95)
+    return threshold_seconds
+
+
+def run_hedged(primary, make_secondary, delay, on_case=None, on_progress=None):
+    """执行对冲请求，返回最先得到有效用例的那一路 StreamAttempt
+
+    primary 在生成引擎中启动；若 delay 秒内没有收到首字（或主请求已失败），
+    再通过 make_secondary() 创建备用请求并发出。两路同时进行时，先完成且解析出
+    用例的一路胜出，另一路被取消并关闭连接。
+
+    对冲触发前主请求的用例会通过 on_case 实时发出；触发后两路均先缓存，
+    胜者确定后再一次性发出，避免重复。
+    """
+    # 任一路收到首字或结束时被唤醒，不轮询
+    changed = threading.Event()
+    started = time.monotonic()
+    primary.watch(changed)
+    primary.start()
+
+    while not (primary.first_token.is_set() or primary.done.is_set()):
+        remaining = started + delay - time.monotonic()
+        if remaining <= 0:
+            break
+        changed.wait(remaining)
+
+    if primary.first_token.is_set() or primary.cancelled:
+        primary.done.wait()
+        # 首字之前就被取消的请求没有首字延迟，不计入样本
+        if primary.ttft is not None:
+            record_ttft(primary.label, primary.ttft)
+        return primary
+
+    primary_live = primary.detach()
+    secondary = make_secondary()
+    if on_progress:
+        if primary.done.is_set():
+            on_progress(f"{primary.label} 调用失败，已改用 {secondary.label}...")
+        else:
+            on_progress(f"{primary.label} 首字超过 {delay:.1f} 秒，已向 {secondary.label} 发起对冲请求...")
+    secondary.watch(changed)
+    secondary.start()
+
+    attempts = [primary, secondary]
+    winner = None
+    while winner is None:
+        changed.clear()
+        finished = [attempt for attempt in attempts if attempt.done.is_set()]
+        for attempt in finished:
+            if attempt.succeeded:
+                winner = attempt
+                break
+        else:
+            if len(finished) == len(attempts):
+                # 两路都失败，以主请求的错误为准
+                winner = primary
+            else:
+                changed.wait()
+
+    # 先记下用户是否已取消，落败的一路随后也会被标记为取消
+    user_cancelled = primary.cancelled
+    for attempt in attempts:
+        if attempt is not winner and not attempt.done.is_set():
+            attempt.cancel()
+        if attempt.ttft is not None:
+            record_ttft(attempt.label, attempt.ttft)
+    if primary.ttft is None and not user_cancelled:
+        # 主请求始终没有首字，至少等待了这么久，作为保守样本计入
+        record_ttft(primary.label, time.monotonic() - started)
+
+    if on_progress and winner.succeeded:
+        on_progress(f"{winner.label} 率先完成，已取消另一路请求")
+    if on_case is not None:
+        emitted = primary_live if winner is primary else 0
+        for case in winner.cases[emitted:]:
+            on_case(case)
+    return winner
@@ -0,0 +1,29 @@
+"""本地 JSON 记录文件的读写
+
+模型性能记录、token 用量记录与需求章节历史共用：读取失败时使用默认值，
+写入先写同目录下的临时文件再替换，进程中途退出也不会留下写了一半的文件。
+"""
+import json
+import os
+import threading
+
+
+def load_json(path, default=None):
+    """读取 JSON 文件，文件不存在或内容损坏时返回 default（默认为空字典）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def save_json(path, data, description, indent=None):
+    """原子地写入 JSON 文件；写入失败只打印提示（description 为记录名称，如“模型性能记录”）"""
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"保存{description}失败: {e}")
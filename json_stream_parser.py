@@ -0,0 +1,321 @@
+import json
+import re
+
+# 非字符串状态下只关心括号和引号；字符串内部只关心引号和转义符
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_IN_STRING = re.compile(r'["\\]')
+# 第一个 JSON 容器之前的推理内容（<think>...</think>）中可能含有括号，需要整体跳过
+_REASONING_OPEN = "<think>"
+_REASONING_CLOSE = "</think>"
+_PREAMBLE = re.compile(r'<think>|[\[{]')
+
+
+def _scan_object(text, start):
+    """从 text[start] 处的 '{' 开始按括号与字符串状态扫描，返回对象闭合后的位置，未闭合时返回 None"""
+    depth = 0
+    in_string = False
+    pos = start
+    while True:
+        if in_string:
+            match = _IN_STRING.search(text, pos)
+            if match is None:
+                return None
+            if match.group() == '\\':
+                pos = match.end() + 1
+            else:
+                in_string = False
+                pos = match.end()
+            continue
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            return None
+        char = match.group()
+        pos = match.end()
+        if char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _braces_outside_strings(text, start):
+    """从 text[start]（位于字符串之外）开始按字符串状态扫描，返回字符串之外的 '{' 位置集合"""
+    braces = set()
+    in_string = False
+    pos = start
+    while True:
+        match = (_IN_STRING if in_string else _STRUCTURAL).search(text, pos)
+        if match is None:
+            return braces
+        char = match.group()
+        pos = match.end()
+        if in_string:
+            if char == '\\':
+                pos += 1
+            else:
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            braces.add(match.start())
+
+
+def _salvage(text):
+    """逐个候选 '{' 独立扫描并解析，返回 (对象列表, 最后一个恢复对象的结束位置, 失败的候选列表)
+
+    失败的候选为 (起始位置, 是否闭合)。一个对象损坏（如缺少引号导致后续字符串状态错位）时，
+    从它之后的下一个 '{' 重新同步，因此不会连带吞掉其后完好的对象。字符串状态错位时无法确定
+    哪些 '{' 位于字符串中，所以每个 '{' 都会尝试；但从上一个完好对象之后按字符串状态扫描，
+    位于字符串内的 '{'（如标题中的 "{x}"）解析失败时不计为失败的候选。
+    """
+    items = []
+    failures = []
+    end = 0
+    pos = 0
+    outside = None  # 从 end 开始扫描得到的字符串之外的 '{'，首次需要时计算
+    while True:
+        start = text.find('{', pos)
+        if start < 0:
+            break
+        stop = _scan_object(text, start)
+        if stop is not None:
+            try:
+                item = json.loads(text[start:stop])
+            except json.JSONDecodeError:
+                item = None
+            if isinstance(item, dict):
+                items.append(item)
+                end = pos = stop
+                outside = None
+                continue
+        if outside is None:
+            outside = _braces_outside_strings(text, end)
+        if start in outside:
+            failures.append((start, stop is not None))
+        pos = start + 1
+    return items, end, failures
+
+
+def salvage_objects(text):
+    """从任意模型输出中提取所有能完整解析的 JSON 对象，返回 (对象列表, 跳过的对象数)"""
+    items, _, failures = _salvage(text)
+    return items, len(failures)
+
+
+def _partial_tag(text, tag):
+    """text 的结尾是被数据块截断的 tag 前缀时返回该前缀"""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if tag.startswith(text[-size:]):
+            return text[-size:]
+    return ""
+
+
+class IncrementalJSONArrayParser:
+    """增量 JSON 数组解析器
+
+    按数据块喂入模型的流式输出，每当数组中的一个对象闭合时立即解析并返回。
+    只缓存当前尚未闭合的对象文本，因此内存占用与单个用例大小相关，而与响应总长度无关。
+
+    兼容以下几种输出形式：
+    - 顶层 JSON 数组: [{...}, {...}]
+    - 包装对象: {"test_cases": [{...}, {...}]}
+    - 单个用例对象: {...}
+    - 数组前后带有 markdown 代码块标记或说明文字，数组之前带有 <think> 推理内容
+
+    第一个顶层容器闭合后的内容视为结尾说明，不再扫描：其中的括号不会被当作未闭合的容器，
+    其中的 {...} 也不会被当作用例。
+
+    某个用例对象损坏时（无法解析，或缺少引号使后续内容的字符串状态错位），从其内部的下一个
+    '{' 重新同步，恢复被它连带吞掉的完好对象；recovered_count 为这样恢复的对象数。
+    """
+
+    def __init__(self, max_object_chars=1_000_000, resync_chars=20_000):
+        self.max_object_chars = max_object_chars
+        self.resync_chars = resync_chars  # 单个用例超过该长度仍未闭合时尝试重新同步
+        self.parsed_count = 0
+        self.skipped_count = 0
+        self.recovered_count = 0
+        self._started = False
+        self._in_reasoning = False
+        self._in_epilogue = False
+        self._pending = ""
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._buffer = []
+        self._buffer_size = 0
+        self._capture_depth = None  # 正在捕获的对象所在的栈深度，None 表示未捕获
+        self._capturing_root = False  # 当前捕获的是顶层对象（可能是包装对象或单个用例）
+
+    def feed(self, chunk):
+        """喂入一个数据块，返回本块中新闭合的对象列表"""
+        items = []
+        if self._in_epilogue:
+            return items
+        if not self._started:
+            chunk = self._skip_preamble(chunk)
+        if not chunk:
+            return items
+
+        pos = 0
+        length = len(chunk)
+        segment_start = 0 if self._capture_depth is not None else None
+
+        while pos < length:
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+
+            if self._in_string:
+                match = _IN_STRING.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == '\\':
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                break
+            char = match.group()
+            index = match.start()
+            pos = match.end()
+
+            if char == '"':
+                # 容器之外的引号属于说明文字，不参与字符串状态
+                if self._stack:
+                    self._in_string = True
+            elif char == '{':
+                if not self._stack:
+                    self._start_capture(0, root=True)
+                    segment_start = index
+                elif self._stack[-1] == '[' and (self._capture_depth is None or self._capturing_root):
+                    # 数组中的对象即为一个用例；顶层对象因此被确认为包装对象，丢弃其缓存
+                    self._start_capture(len(self._stack), root=False)
+                    segment_start = index
+                self._stack.append(char)
+            elif char == '[':
+                self._stack.append(char)
+            else:
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if char == '}' and self._capture_depth is not None and len(self._stack) == self._capture_depth:
+                    self._buffer.append(chunk[segment_start:pos])
+                    items.extend(self._finish_capture())
+                    segment_start = None
+                if not self._stack:
+                    # 第一个顶层容器已闭合，之后的内容（说明文字、代码块结束标记等）不再扫描
+                    self._in_epilogue = True
+                    break
+
+        if self._capture_depth is not None and segment_start is not None:
+            self._buffer.append(chunk[segment_start:])
+            self._buffer_size += length - segment_start
+            if self._buffer_size > self.max_object_chars:
+                # 单个对象异常巨大（通常是输出损坏），放弃该对象以保证内存有界
+                self._reset_capture()
+                self.skipped_count += 1
+            elif self._buffer_size > self.resync_chars and not self._capturing_root:
+                items.extend(self._resync())
+
+        return items
+
+    def finish(self):
+        """输出结束时调用：从尚未闭合的对象中恢复其中完好的对象，返回恢复出的对象列表"""
+        if self._capture_depth is None or self._capturing_root:
+            return []
+        items, end, failures = _salvage("".join(self._buffer))
+        # 最后一个恢复对象之后未闭合的候选属于被截断的内容，不计为跳过
+        self.skipped_count += sum(1 for start, closed in failures if start < end or closed)
+        self._count_recovered(items)
+        self._reset_capture()
+        return items
+
+    @property
+    def unterminated(self):
+        """已开始的 JSON 容器尚未闭合（输出被截断）"""
+        return bool(self._stack)
+
+    def _skip_preamble(self, chunk):
+        """在第一个 JSON 容器出现之前跳过 <think>...</think> 推理内容，返回从第一个容器开始的文本"""
+        text = self._pending + chunk
+        self._pending = ""
+        while text:
+            if self._in_reasoning:
+                end = text.find(_REASONING_CLOSE)
+                if end < 0:
+                    self._pending = _partial_tag(text, _REASONING_CLOSE)
+                    return ""
+                text = text[end + len(_REASONING_CLOSE):]
+                self._in_reasoning = False
+                continue
+            match = _PREAMBLE.search(text)
+            if match is None:
+                self._pending = _partial_tag(text, _REASONING_OPEN)
+                return ""
+            if match.group() == _REASONING_OPEN:
+                text = text[match.end():]
+                self._in_reasoning = True
+                continue
+            self._started = True
+            return text[match.start():]
+        return ""
+
+    def _resync(self):
+        """当前用例过长仍未闭合，多半是其中某个对象损坏导致字符串状态错位：
+        恢复其中完好的对象，并从最后一个恢复对象之后以正确的状态重新扫描"""
+        text = "".join(self._buffer)
+        items, end, failures = _salvage(text)
+        if not items:
+            return []
+        self.skipped_count += sum(1 for start, _ in failures if start < end)
+        self._count_recovered(items)
+        self._stack = self._stack[:self._capture_depth]
+        self._in_string = False
+        self._escape = False
+        self._reset_capture()
+        return items + self.feed(text[end:])
+
+    def _count_recovered(self, items):
+        self.parsed_count += len(items)
+        self.recovered_count += len(items)
+
+    def _start_capture(self, depth, root):
+        self._buffer = []
+        self._buffer_size = 0
+        self._capture_depth = depth
+        self._capturing_root = root
+
+    def _reset_capture(self):
+        self._buffer = []
+        self._buffer_size = 0
+        self._capture_depth = None
+        self._capturing_root = False
+
+    def _finish_capture(self):
+        text = "".join(self._buffer)
+        root = self._capturing_root
+        self._reset_capture()
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            item = None
+        if isinstance(item, dict):
+            self.parsed_count += 1
+            return [item]
+        if root:
+            self.skipped_count += 1
+            return []
+        # 对象闭合但无法解析：其中可能连带包含了后续完好的对象
+        items, _, failures = _salvage(text)
+        self.skipped_count += len(failures)
+        self._count_recovered(items)
+        return items
@@ -1,15 +1,23 @@
 import sys
 import os
+import time
+
+# 进程启动时刻，用于记录启动器的可交互耗时
+_STARTED = time.perf_counter()
 
 if hasattr(sys, 'frozen'):
     os.environ['PATH'] = sys._MEIPASS + ";" + os.environ['PATH']
 import subprocess
+from importlib.util import find_spec
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QMessageBox,
                              QProgressBar, QFrame, QGridLayout)
-from PyQt5.QtCore import Qt, pyqtSignal, QThread
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt5.QtGui import QFont, QIcon
 
+# 运行增强版所需的依赖包（导入名）
+REQUIRED_MODULES = ("PyQt5", "openai", "openpyxl")
+
 # 定义样式表
 STYLESHEET = """
     QMainWindow {
@@ -99,12 +107,39 @@ class InstallThread(QThread):
             self.finished.emit(False, f"安装过程中出错：{str(e)}")
 
 
+class PrewarmThread(QThread):
+    """在后台导入增强版模块及其依赖并读取配置，点击启动时即可直接创建窗口"""
+    ready = pyqtSignal(object, float)
+    failed = pyqtSignal(str)
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            import deepseek_test_generator_gui_enhanced as enhanced_module
+            config = enhanced_module.prewarm()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.ready.emit(config, (time.perf_counter() - started) * 1000)
+
+
+def log_startup(window, elapsed_ms, detail=""):
+    """打印窗口的可交互耗时"""
+    print(f"⏱ {window}可交互耗时 {elapsed_ms:.0f} ms{detail}")
+
+
 class LauncherGUI(QMainWindow):
     """启动器GUI界面"""
 
     def __init__(self):
         super().__init__()
         self.enhanced_window = None
+        self.prewarm_thread = None
+        self.prewarmed_config = None
+        self.prewarm_ms = None
+        self.launcher_ms = None
+        self.launch_pending = False
+        self.launch_started = None
         self.initUI()
 
     def initUI(self):
@@ -220,19 +255,52 @@ class LauncherGUI(QMainWindow):
         self.checkDependencies()
 
     def checkDependencies(self):
-        """检查依赖包状态"""
-        try:
-            import PyQt5
-            import pandas
-            import openai
+        """检查依赖包状态（只查找模块，不实际导入，避免拖慢启动）"""
+        missing_modules = [name for name in REQUIRED_MODULES if find_spec(name) is None]
+        if not missing_modules:
             self.status_label.setText('✅ 所有依赖包已安装')
             self.status_label.setStyleSheet("color: #52c41a; font-weight: bold; font-size: 12px;")
             return True
-        except ImportError as e:
-            missing_module = str(e).split("'")[1] if "'" in str(e) else str(e)
-            self.status_label.setText(f'⚠️ 缺少依赖包: {missing_module}')
-            self.status_label.setStyleSheet("color: #faad14; font-weight: bold; font-size: 12px;")
-            return False
+        self.status_label.setText(f'⚠️ 缺少依赖包: {", ".join(missing_modules)}')
+        self.status_label.setStyleSheet("color: #faad14; font-weight: bold; font-size: 12px;")
+        return False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.launcher_ms is None:
+            # 窗口绘制完成、事件循环空闲后再记录耗时并开始预热，不拖慢启动器本身的显示
+            QTimer.singleShot(0, self.onLauncherInteractive)
+
+    def onLauncherInteractive(self):
+        self.launcher_ms = (time.perf_counter() - _STARTED) * 1000
+        log_startup("启动器", self.launcher_ms)
+        self.startPrewarm()
+
+    def startPrewarm(self):
+        """依赖齐全时在后台预热增强版"""
+        if self.prewarm_ms is not None or self.enhanced_window is not None:
+            return
+        if self.prewarm_thread is not None and self.prewarm_thread.isRunning():
+            return
+        if any(find_spec(name) is None for name in REQUIRED_MODULES):
+            return
+        self.prewarm_thread = PrewarmThread()
+        self.prewarm_thread.ready.connect(self.onPrewarmReady)
+        self.prewarm_thread.failed.connect(self.onPrewarmFailed)
+        self.prewarm_thread.start()
+
+    def onPrewarmReady(self, config, elapsed_ms):
+        self.prewarmed_config = config
+        self.prewarm_ms = elapsed_ms
+        print(f"增强版预加载完成，耗时 {elapsed_ms:.0f} ms")
+        if self.launch_pending:
+            self.openEnhancedWindow()
+
+    def onPrewarmFailed(self, message):
+        # 预热失败不提示，点击启动时会同步导入并显示具体错误
+        print(f"增强版预加载失败: {message}")
+        if self.launch_pending:
+            self.openEnhancedWindow()
 
     def launchEnhancedVersion(self):
         """启动增强版本"""
@@ -248,21 +316,55 @@ class LauncherGUI(QMainWindow):
                 self.installRequirements()
             return
 
+        self.launch_started = time.perf_counter()
+        if self.prewarm_thread is not None and self.prewarm_thread.isRunning():
+            # 预热尚未完成：等它完成后再创建窗口，避免在界面线程中重复导入
+            self.launch_pending = True
+            self.enhanced_btn.setEnabled(False)
+            self.status_label.setText('⏳ 正在加载增强版...')
+            return
+        self.openEnhancedWindow()
+
+    def openEnhancedWindow(self):
+        """创建并显示增强版窗口，已预热时直接使用预读取的配置"""
+        self.launch_pending = False
+        self.enhanced_btn.setEnabled(True)
+        self.checkDependencies()
+        prewarmed = self.prewarm_ms is not None
+        config, self.prewarmed_config = self.prewarmed_config, None
         try:
             self.hide()
             import deepseek_test_generator_gui_enhanced as enhanced_module
-            self.enhanced_window = enhanced_module.TestGeneratorGUI()
+            self.enhanced_window = enhanced_module.TestGeneratorGUI(config=config)
             self.enhanced_window.destroyed.connect(self.onEnhancedWindowClosed)
             self.enhanced_window.show()
+            QTimer.singleShot(0, lambda: self.onEnhancedInteractive(prewarmed))
         except Exception as e:
             QMessageBox.critical(self, '启动失败', f'无法启动增强版本：{str(e)}')
             self.show()
 
+    def onEnhancedInteractive(self, prewarmed):
+        """记录从点击启动到增强版窗口可交互的耗时"""
+        elapsed_ms = (time.perf_counter() - self.launch_started) * 1000
+        log_startup("增强版", elapsed_ms, "（已预热）" if prewarmed else "（未预热）")
+        if self.enhanced_window is None:
+            return
+        from telemetry import metrics_log_path, append_metrics_log
+        path = metrics_log_path(self.enhanced_window.config.get("telemetry", {}))
+        if path:
+            append_metrics_log({
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "event": "startup",
+                "launcher_ms": round(self.launcher_ms, 1) if self.launcher_ms is not None else None,
+                "window_ms": round(elapsed_ms, 1),
+                "prewarmed": prewarmed,
+                "prewarm_ms": round(self.prewarm_ms, 1) if prewarmed else None,
+            }, path)
+
     def onEnhancedWindowClosed(self):
         """增强版窗口关闭时的处理"""
         self.enhanced_window = None
         self.show()
-        self.checkDependencies()
 
     def installRequirements(self):
         """安装依赖包"""
@@ -291,11 +393,18 @@ class LauncherGUI(QMainWindow):
             self.status_label.setStyleSheet("color: #52c41a; font-weight: bold; font-size: 12px;")
             QMessageBox.information(self, '安装成功', '依赖包已成功安装！')
             self.checkDependencies()
+            self.startPrewarm()
         else:
             self.status_label.setText('❌ 依赖包安装失败')
             self.status_label.setStyleSheet("color: #ff4d4f; font-weight: bold; font-size: 12px;")
             QMessageBox.critical(self, '安装失败', message)
 
+    def closeEvent(self, event):
+        # 导入无法中途停止，等待预热线程结束，避免线程仍在运行时被销毁
+        if self.prewarm_thread is not None and self.prewarm_thread.isRunning():
+            self.prewarm_thread.wait()
+        super().closeEvent(event)
+
     def viewDocumentation(self):
         """查看说明文档"""
         readme_path = 'README.md'
@@ -321,7 +430,7 @@ class LauncherGUI(QMainWindow):
 
 ## 依赖包
 - PyQt5: GUI界面库
-- pandas: 数据处理库
+- openpyxl: Excel 导出库
 - openai: API调用库
 
 ## 注意事项
@@ -0,0 +1,116 @@
+"""按需求规模自动选择模型
+
+服务选择 auto 时，从 config.json 的 routing.candidates 中为每次生成挑选服务与模型。
+每次分块生成结束后按 "服务/模型" 记录实测的首字延迟、输出速度、解析成功率，以及成功完成过的
+最大需求分块（model_stats.json）。小需求选预计最快完成的模型；大需求以可靠性为先，
+优先选成功率高、且实际完成过同等规模分块的模型。没有记录的模型使用候选配置中的初始估计。
+"""
+import os
+import threading
+
+from json_store import load_json, save_json
+
+AUTO_SERVICE = "auto"
+DEFAULT_STATS_PATH = os.path.join(os.path.expanduser("~"), ".ai_test_generator", "model_stats.json")
+# 需求不超过该 token 数时视为小需求，按速度选择
+DEFAULT_SMALL_JOB_TOKENS = 3000
+# 没有实测记录、候选配置也未给出初始估计时使用的保守值
+DEFAULT_PRIOR_TTFT = 10.0
+DEFAULT_PRIOR_TOKENS_PER_SECOND = 30.0
+# 实测值的指数滑动平均权重
+STATS_WEIGHT = 0.3
+# 大需求中没有完成过同等规模分块的模型，预计耗时按该倍数计
+UNPROVEN_PENALTY = 2.0
+
+
+class ModelStatsHistory:
+    """按 "服务/模型" 记录实测性能，持久化为 JSON 文件"""
+
+    def __init__(self, path=DEFAULT_STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._models = load_json(path)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._models.get(key)
+            return dict(entry) if entry else None
+
+    def record(self, key, success, ttft=None, tokens_per_second=None, input_tokens=0):
+        """记录一次分块生成：是否成功解析出用例、首字延迟、输出速度与该分块的需求 token 数"""
+        with self._lock:
+            entry = self._models.setdefault(key, {"runs": 0, "successes": 0, "max_input_tokens": 0})
+            entry["runs"] += 1
+            if success:
+                entry["successes"] += 1
+                entry["max_input_tokens"] = max(entry["max_input_tokens"], input_tokens)
+            for name, value in (("ttft", ttft), ("tokens_per_second", tokens_per_second)):
+                if value:
+                    entry[name] = value if name not in entry else entry[name] + STATS_WEIGHT * (value - entry[name])
+            self._save()
+
+    def _save(self):
+        save_json(self.path, self._models, "模型性能记录", indent=2)
+
+
+_default_stats = None
+_default_stats_lock = threading.Lock()
+
+
+def default_stats():
+    """进程内共享的模型性能记录，首次使用时加载"""
+    global _default_stats
+    with _default_stats_lock:
+        if _default_stats is None:
+            _default_stats = ModelStatsHistory()
+        return _default_stats
+
+
+def success_rate(entry):
+    """解析成功率，按 (成功 + 1) / (次数 + 2) 平滑，没有记录时为 50%"""
+    if not entry:
+        return 0.5
+    return (entry["successes"] + 1) / (entry["runs"] + 2)
+
+
+def expected_seconds(entry, candidate, output_tokens):
+    """预计完成时间：首字延迟 + 输出 token 数 / 输出速度"""
+    entry = entry or {}
+    ttft = entry.get("ttft") or candidate.get("prior_ttft", DEFAULT_PRIOR_TTFT)
+    speed = entry.get("tokens_per_second") or candidate.get("prior_tokens_per_second", DEFAULT_PRIOR_TOKENS_PER_SECOND)
+    return ttft + output_tokens / max(speed, 1.0)
+
+
+def choose_model(candidates, requirement_tokens, output_tokens, section_tokens=None,
+                 small_job_tokens=DEFAULT_SMALL_JOB_TOKENS, stats=None):
+    """从候选中选出一个，返回 (候选, 选择说明)
+
+    candidates 为包含 service、model 的字典列表（可带 prior_ttft、prior_tokens_per_second），
+    列表顺序作为同分时的偏好；output_tokens(candidate) 返回该模型预计的输出 token 数；
+    section_tokens 为单个分块的最大 token 数（大需求会被拆分，可靠性按分块规模衡量）。
+    """
+    stats = stats or default_stats()
+    small = requirement_tokens <= small_job_tokens
+    section_tokens = min(requirement_tokens, section_tokens or requirement_tokens)
+    best = None
+    for order, candidate in enumerate(candidates):
+        entry = stats.get(f"{candidate['service']}/{candidate['model']}")
+        rate = success_rate(entry)
+        seconds = expected_seconds(entry, candidate, output_tokens(candidate))
+        if small:
+            # 失败需要重新生成，期望耗时按成功率放大
+            score = seconds / rate
+        else:
+            score = seconds / (rate * rate)
+            if not entry or entry["max_input_tokens"] < section_tokens:
+                score *= UNPROVEN_PENALTY
+        if best is None or (score, order) < best[0]:
+            best = ((score, order), candidate, entry, rate, seconds)
+
+    _, candidate, entry, rate, seconds = best
+    runs = entry["runs"] if entry else 0
+    basis = f"依据 {runs} 次实测记录" if runs else "暂无实测记录，按初始估计"
+    kind = "小需求优先速度" if small else "大需求优先可靠性"
+    reason = (f"需求约 {requirement_tokens} token，{kind}；预计 {seconds:.0f} 秒完成，"
+              f"成功率约 {rate:.0%}，{basis}")
+    return candidate, reason
@@ -0,0 +1,185 @@
+"""请求限速与重试
+
+- TokenBucket / ProviderLimiter：按服务商的每分钟请求数与每分钟 token 数在客户端限速，
+  多路并发生成时主动排队，而不是等服务端返回 429
+- call_with_retry_async：对 429、5xx、连接错误按指数退避加随机抖动重试，并遵循 Retry-After，
+  供 generation_engine 事件循环中的流式调用使用
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RETRY_CONFIG = {
+    "max_attempts": 4,
+    "base_delay": 1.0,
+    "max_delay": 30.0,
+}
+# 可重试的 HTTP 状态码（5xx 另行判断）
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+async def sleep_async(seconds, should_abort=None):
+    """分段休眠，should_abort() 返回 True 时提前结束，返回是否被中止；等待期间不阻塞事件循环"""
+    deadline = time.monotonic() + seconds
+    while True:
+        if should_abort is not None and should_abort():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(remaining, 0.1))
+
+
+class TokenBucket:
+    """令牌桶，容量默认等于每分钟配额
+
+    reserve() 立即扣减并返回需要等待的秒数（余额可以为负，表示排队中的请求），
+    因此并发调用者按到达顺序依次获得配额，等待期间不持有锁。
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def consume(self, amount):
+        """事后记账（如实际输出 token 数），不等待"""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class ProviderLimiter:
+    """单个服务商的限速器，requests_per_minute / tokens_per_minute 为 0 表示不限制"""
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def reserve(self, tokens=0):
+        """为一次请求预留配额，不等待，返回需要等待的秒数"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    async def acquire_async(self, tokens=0, should_abort=None):
+        """为一次请求申请配额，必要时等待（不阻塞事件循环），返回等待的秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await sleep_async(wait, should_abort)
+        return wait
+
+    def record_tokens(self, tokens):
+        """记录请求实际消耗的输出 token"""
+        if self.tokens is not None and tokens:
+            self.tokens.consume(tokens)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider, rate_limits_config):
+    """返回服务商共享的限速器；config.json 的 rate_limits 节中没有该服务商时使用 default 项"""
+    limits = rate_limits_config.get(provider) or rate_limits_config.get("default") or {}
+    settings = (limits.get("requests_per_minute", 0), limits.get("tokens_per_minute", 0))
+    with _limiters_lock:
+        entry = _limiters.get(provider)
+        if entry is None or entry[0] != settings:
+            entry = (settings, ProviderLimiter(*settings))
+            _limiters[provider] = entry
+        return entry[1]
+
+
+def retry_after_seconds(error):
+    """从异常携带的响应头中读取 Retry-After（支持秒数、HTTP 日期与 retry-after-ms）"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """判断异常是否值得重试：429/408/409、5xx、连接错误与超时"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    try:
+        from openai import APIConnectionError
+    except ImportError:
+        return False
+    return isinstance(error, APIConnectionError)
+
+
+def _retry_delay(error, attempt, settings):
+    """第 attempt 次失败后的等待秒数：优先使用 Retry-After，否则指数退避加抖动"""
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = random.uniform(0, min(settings["max_delay"], settings["base_delay"] * 2 ** (attempt - 1)))
+    return delay
+
+
+def _retry_settings(retry_config):
+    settings = dict(DEFAULT_RETRY_CONFIG)
+    settings.update(retry_config or {})
+    return settings, max(1, int(settings["max_attempts"]))
+
+
+async def call_with_retry_async(func, retry_config=None, on_retry=None, should_abort=None):
+    """调用 func() 并等待其结果，失败且可重试时按指数退避加抖动重试
+
+    优先使用服务端给出的 Retry-After，否则等待 min(max_delay, base_delay * 2^n) 内的随机时长。
+    on_retry(attempt, delay, error) 在每次等待前调用；should_abort() 为 True 时不再重试。
+    """
+    settings, max_attempts = _retry_settings(retry_config)
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await func()
+        except Exception as error:
+            if attempt == max_attempts or not is_retryable(error):
+                raise
+            if should_abort is not None and should_abort():
+                raise
+
+            delay = _retry_delay(error, attempt, settings)
+            if on_retry is not None:
+                on_retry(attempt, delay, error)
+            if await sleep_async(delay, should_abort):
+                raise
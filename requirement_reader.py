@@ -0,0 +1,145 @@
+"""从文件导入需求
+
+.md / .txt 通过内存映射逐行读取，边读边按标题切分章节，不把整个文件读成一个字符串后再切分；
+编码依次尝试 UTF-8（可带 BOM）与 GB18030。.docx 从压缩包内的 word/document.xml 流式解析段落，
+标题样式转为 Markdown 标题后同样切分。进度通过回调报告，可在任意线程中执行。
+"""
+import codecs
+import mmap
+import os
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse, ParseError
+
+from requirement_splitter import estimate_tokens, iter_sections
+
+REQUIREMENT_EXTENSIONS = (".md", ".txt", ".docx")
+TEXT_ENCODINGS = ("utf-8-sig", "gb18030")
+# 编辑器中显示的预览字数，完整内容按章节直接交给生成任务
+DEFAULT_PREVIEW_CHARS = 20000
+# 每读取约 1 MB 报告一次进度
+_PROGRESS_STEP = 1 << 20
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Word 标题样式：英文版 "Heading1" / "heading 1"，中文版 "标题 1" 或样式 ID "1"~"9"
+_HEADING_STYLE = re.compile(r'^(?:heading|标题)?\s*([1-9])$', re.IGNORECASE)
+
+
+class RequirementDocument:
+    """导入的需求文件：按标题切分好的章节，以及在编辑器中显示的预览"""
+
+    def __init__(self, path, sections, size, preview_chars=DEFAULT_PREVIEW_CHARS):
+        self.path = path
+        self.sections = sections
+        self.size = size  # 文件字节数
+        self.chars = sum(len(section) for section in sections)
+        self.tokens = sum(estimate_tokens(section) for section in sections)
+        self.preview = self._build_preview(preview_chars)
+        self._text = None
+
+    def _build_preview(self, preview_chars):
+        parts = []
+        remaining = preview_chars
+        for section in self.sections:
+            if remaining <= 0:
+                break
+            parts.append(section[:remaining])
+            remaining -= len(section)
+        preview = "".join(parts)
+        if self.chars > preview_chars:
+            preview += (f"\n\n……（仅显示前 {preview_chars} 字预览，完整内容共 {self.chars} 字、"
+                        f"{len(self.sections)} 个章节，生成时直接使用文件内容）")
+        return preview
+
+    @property
+    def text(self):
+        """完整需求文本（首次访问时拼接）"""
+        if self._text is None:
+            self._text = "".join(self.sections)
+        return self._text
+
+    def summary(self):
+        return (f"{os.path.basename(self.path)}：{self.size / (1024 * 1024):.1f} MB，"
+                f"{len(self.sections)} 个章节，约 {self.tokens} tokens")
+
+
+def read_requirement_file(path, preview_chars=DEFAULT_PREVIEW_CHARS, on_progress=None):
+    """读取需求文件并按标题切分章节，返回 RequirementDocument
+
+    on_progress(bytes_read, total_bytes) 在读取过程中调用；不支持的格式、无法解码或内容为空时抛出 ValueError。
+    """
+    on_progress = on_progress or (lambda done, total: None)
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REQUIREMENT_EXTENSIONS:
+        raise ValueError(f"不支持的需求文件格式：{extension or '无扩展名'}（支持 {' / '.join(REQUIREMENT_EXTENSIONS)}）")
+    size = os.path.getsize(path)
+
+    if extension == ".docx":
+        try:
+            sections = list(iter_sections(_iter_docx_lines(path, on_progress)))
+        except (zipfile.BadZipFile, KeyError, ParseError) as e:
+            raise ValueError(f"无法读取 Word 文档：{e}")
+    else:
+        sections = None
+        for encoding in TEXT_ENCODINGS:
+            try:
+                sections = list(iter_sections(_iter_text_lines(path, size, encoding, on_progress)))
+                break
+            except UnicodeDecodeError:
+                continue
+        if sections is None:
+            raise ValueError(f"无法识别文件编码，请另存为 UTF-8 后重试：{path}")
+
+    if not sections:
+        raise ValueError("需求内容为空")
+    on_progress(size, size)
+    return RequirementDocument(path, sections, size, preview_chars)
+
+
+def _iter_text_lines(path, size, encoding, on_progress):
+    """通过内存映射逐行解码文本文件，统一换行符为 \\n"""
+    if size == 0:
+        return
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reported = 0
+        for raw in iter(mapped.readline, b""):
+            yield decoder.decode(raw).replace("\r\n", "\n")
+            position = mapped.tell()
+            if position - reported >= _PROGRESS_STEP:
+                on_progress(position, size)
+                reported = position
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def _iter_docx_lines(path, on_progress):
+    """逐段产出 Word 文档正文，每段一行；标题样式的段落加上对应级别的 Markdown 标题前缀"""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("word/document.xml")
+        with archive.open(info) as f:
+            parts = []
+            level = 0
+            reported = 0
+            for _, element in iterparse(f, events=("end",)):
+                tag = element.tag
+                if tag == _W + "t":
+                    parts.append(element.text or "")
+                elif tag == _W + "tab":
+                    parts.append("\t")
+                elif tag == _W + "pStyle":
+                    match = _HEADING_STYLE.match(element.get(_W + "val", ""))
+                    level = int(match.group(1)) if match else 0
+                elif tag == _W + "p":
+                    text = "".join(parts)
+                    if level and text.strip():
+                        text = "#" * min(level, 6) + " " + text
+                    yield text + "\n"
+                    parts = []
+                    level = 0
+                    element.clear()
+                    position = f.tell()
+                    if position - reported >= _PROGRESS_STEP:
+                        on_progress(position, info.file_size)
+                        reported = position
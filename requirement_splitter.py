@@ -0,0 +1,86 @@
+import math
+import re
+
+# 识别常见的需求文档标题：Markdown 标题、"第X章/节"、"一、"、多级编号 "1.2 xxx"
+_HEADING = re.compile(
+    r'^\s*(?:'
+    r'#{1,6}\s+\S'
+    r'|第[一二三四五六七八九十百零\d]+[章节部分篇]'
+    r'|[一二三四五六七八九十]+、'
+    r'|\d+(?:\.\d+)+\s*\S'
+    r')'
+)
+_CJK = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+
+
+def estimate_tokens(text):
+    """粗略估算文本的 token 数：中文字符约 1 token/字，其余字符约 4 字符/token"""
+    if not text:
+        return 0
+    cjk_count = len(_CJK.findall(text))
+    return cjk_count + math.ceil((len(text) - cjk_count) / 4)
+
+
+def iter_sections(lines):
+    """从逐行读取的文本（保留换行符）中按标题依次产出章节，标题行归属于其后的章节"""
+    current = []
+    for line in lines:
+        if _HEADING.match(line) and any(item.strip() for item in current):
+            yield "".join(current)
+            current = []
+        current.append(line)
+    if any(item.strip() for item in current):
+        yield "".join(current)
+
+
+def split_sections(text):
+    """按标题将需求文档切分为章节，标题行归属于其后的章节"""
+    return list(iter_sections(text.splitlines(keepends=True)))
+
+
+def _split_oversized(section, max_tokens):
+    """将超出预算的单个章节依次按段落、行、字符切分"""
+    for separator in ("\n\n", "\n"):
+        parts = [part for part in section.split(separator) if part.strip()]
+        if len(parts) > 1:
+            return pack_sections([part + separator for part in parts], max_tokens)
+
+    # 没有可用的换行，只能按字符硬切；以最坏情况 1 token/字符计算长度
+    return [section[i:i + max_tokens] for i in range(0, len(section), max_tokens)]
+
+
+def pack_sections(sections, max_tokens):
+    """将相邻的小章节合并，使每块尽量接近但不超过 max_tokens"""
+    chunks = []
+    current = ""
+    current_tokens = 0
+    for section in sections:
+        tokens = estimate_tokens(section)
+        if tokens > max_tokens:
+            if current.strip():
+                chunks.append(current)
+            current, current_tokens = "", 0
+            chunks.extend(_split_oversized(section, max_tokens))
+            continue
+        if current_tokens + tokens > max_tokens and current.strip():
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current += section
+        current_tokens += tokens
+    if current.strip():
+        chunks.append(current)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def split_requirements(text, max_tokens, sections=None):
+    """将需求文本切分为若干块，每块不超过 max_tokens；文本本身不超预算时原样返回一块
+
+    sections 为已按标题切分好的章节（如从文件导入时边读边切分）时直接按预算合并，不再重新切分 text。
+    """
+    if sections is not None:
+        if sum(estimate_tokens(section) for section in sections) <= max_tokens:
+            return ["".join(sections)]
+        return pack_sections(sections, max_tokens)
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    return pack_sections(split_sections(text), max_tokens)
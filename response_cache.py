@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".ai_test_generator", "response_cache")
+DEFAULT_MAX_SIZE_MB = 200
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def cache_key(base_url, api_params):
+    """根据 base_url 与请求参数（模型、提示词、需求、采样参数）计算内容寻址的缓存键
+
+    输出长度上限由 token_budget 动态估算，不影响生成内容，不计入缓存键。
+    """
+    params = {name: value for name, value in api_params.items() if name not in ("stream", "max_tokens")}
+    if "tokens_to_generate" in params.get("extra_body", {}):
+        params["extra_body"] = {name: value for name, value in params["extra_body"].items()
+                                if name != "tokens_to_generate"}
+    payload = json.dumps({"base_url": base_url, "params": params},
+                         sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """磁盘上的用例响应缓存
+
+    每个条目是一个以缓存键命名的 JSON 文件，文件的修改时间即最近访问时间。
+    超过 max_age_seconds 未被访问的条目在读取时或首次加载索引时删除；总大小超过 max_bytes 时
+    从最久未访问的条目开始删除（LRU）。条目索引与总大小在首次写入时扫描一次目录得到，
+    之后随读写增量维护，写入时只有超过上限才会删除条目。
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+                 max_age_seconds=DEFAULT_MAX_AGE_DAYS * 86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None  # 路径 → 文件大小，按最近访问时间从旧到新排列；None 表示尚未加载
+        self._total = 0
+
+    @classmethod
+    def from_config(cls, cache_config):
+        """根据 config.json 的 cache 节创建缓存"""
+        return cls(
+            directory=cache_config.get("directory") or DEFAULT_CACHE_DIR,
+            max_bytes=int(cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024),
+            max_age_seconds=cache_config.get("max_age_days", DEFAULT_MAX_AGE_DAYS) * 86400,
+        )
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """读取缓存的用例列表，未命中或已过期时返回 None"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                cases = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+                self._forget(path)
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if self._entries is not None and path in self._entries:
+                self._entries.move_to_end(path)
+        return cases
+
+    def put(self, key, cases):
+        """写入用例列表，总大小超过上限时执行淘汰；写入失败只打印提示，不影响生成流程"""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cases, f, ensure_ascii=False)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"写入响应缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._entries is None:
+                # 首次写入时扫描目录，已包含刚写入的条目
+                self._load_entries()
+            else:
+                self._forget(path)
+                self._entries[path] = size
+                self._total += size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _load_entries(self):
+        """扫描缓存目录，删除过期条目，按最近访问时间建立索引并统计总大小"""
+        now = time.time()
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if now - stat.st_mtime > self.max_age_seconds:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+        self._entries = OrderedDict((path, size) for _, path, size in entries)
+        self._total = sum(self._entries.values())
+
+    def _forget(self, path):
+        if self._entries is not None:
+            self._total -= self._entries.pop(path, 0)
+
+    def _evict(self):
+        """从最久未访问的条目开始删除，直到总大小不超过 max_bytes"""
+        while self._total > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(path)
+            except OSError:
+                # 已被其他进程删除
+                continue
+
+    def stats(self):
+        """返回 (命中次数, 未命中次数)"""
+        with self._lock:
+            return self.hits, self.misses
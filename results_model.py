@@ -0,0 +1,159 @@
+"""生成结果表格的数据模型
+
+CaseTableModel 为 QTableView 提供数据：只保存每个用例的显示文本，不为行创建任何控件，
+视图只向模型请求可见区域的单元格，因此几万行时依然流畅。用例按批追加（appendCases），
+筛选（模块、优先级、标题关键字）与排序都在模型内部对行下标列表完成，
+visibleCases() 返回当前显示的用例，用于“导出当前显示”。
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from case_schema import DEFAULT_DIRECTORY, format_steps, normalize_priority
+
+COLUMNS = ("序号", "模块", "用例标题", "优先级", "测试步骤", "预期结果")
+# 序号列按数字排序，其余列按文本
+_NUMBER_COLUMN = 0
+_MODULE, _TITLE, _PRIORITY, _STEPS, _EXPECTED = range(1, 6)
+
+
+def _case_row(number, case):
+    """用例的显示文本：(序号, 模块, 标题, 优先级, 步骤, 预期结果)"""
+    if not isinstance(case, dict):
+        return (number, "", str(case), "", "", "")
+    priority = case.get("priority", "")
+    expected = case.get("expected_result", "")
+    return (
+        number,
+        str(case.get("directory") or DEFAULT_DIRECTORY),
+        str(case.get("title", "")),
+        normalize_priority(priority) or str(priority),
+        format_steps(case.get("steps")),
+        format_steps(expected) if isinstance(expected, list) else str(expected),
+    )
+
+
+class CaseTableModel(QAbstractTableModel):
+    """生成结果的表格模型，支持按批追加、筛选与排序"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cases = []
+        self._rows = []
+        self._visible = []  # 当前显示的行在 _rows 中的下标
+        self._modules = {}  # 模块名 -> 首次出现的顺序
+        self._module = None
+        self._priority = None
+        self._keyword = ""
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+
+    # --- QAbstractTableModel 接口 ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[self._visible[index.row()]][index.column()]
+        if role == Qt.DisplayRole:
+            # 多行文本在单元格中显示为一行，保持行高一致，完整内容见悬停提示
+            return value.replace("\n", "  ") if isinstance(value, str) else value
+        if role == Qt.ToolTipRole and index.column() in (_TITLE, _STEPS, _EXPECTED):
+            return value
+        if role == Qt.TextAlignmentRole and index.column() in (_NUMBER_COLUMN, _PRIORITY):
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 按序号升序即解析顺序，此时追加的行无需重新排序
+        natural = column < 0 or (column == _NUMBER_COLUMN and order == Qt.AscendingOrder)
+        self._sort_column = None if natural else column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        if natural:
+            self._visible.sort()
+        else:
+            self._sortVisible()
+        self.layoutChanged.emit()
+
+    # --- 数据 ---
+    def appendCases(self, cases):
+        """追加一批用例；符合当前筛选条件的行立即显示"""
+        if not cases:
+            return
+        start = len(self._rows)
+        self._cases.extend(cases)
+        self._rows.extend(_case_row(start + offset + 1, case) for offset, case in enumerate(cases))
+        for row in self._rows[start:]:
+            self._modules.setdefault(row[_MODULE], len(self._modules))
+        matched = [index for index in range(start, len(self._rows)) if self._accepts(self._rows[index])]
+        if not matched:
+            return
+        first = len(self._visible)
+        self.beginInsertRows(QModelIndex(), first, first + len(matched) - 1)
+        self._visible.extend(matched)
+        self.endInsertRows()
+        if self._sort_column is not None:
+            self.sort(self._sort_column, self._sort_order)
+
+    def setCases(self, cases):
+        """用一组用例替换全部内容（如生成结束后换成去重后的最终结果），保留筛选与排序条件"""
+        self.beginResetModel()
+        self._cases = list(cases)
+        self._rows = [_case_row(number, case) for number, case in enumerate(self._cases, 1)]
+        self._modules = {}
+        for row in self._rows:
+            self._modules.setdefault(row[_MODULE], len(self._modules))
+        self._refilter()
+        self.endResetModel()
+
+    def clear(self):
+        self.setCases([])
+
+    def setFilter(self, module=None, priority=None, keyword=""):
+        """按模块、优先级（None 表示全部）与标题关键字筛选"""
+        self.beginResetModel()
+        self._module = module
+        self._priority = priority
+        self._keyword = keyword.strip().lower()
+        self._refilter()
+        self.endResetModel()
+
+    def modules(self):
+        """按首次出现顺序返回所有模块名"""
+        return sorted(self._modules, key=self._modules.get)
+
+    def totalCount(self):
+        return len(self._rows)
+
+    def visibleCases(self):
+        """当前筛选与排序下显示的用例"""
+        return [self._cases[index] for index in self._visible]
+
+    def _accepts(self, row):
+        if self._module is not None and row[_MODULE] != self._module:
+            return False
+        if self._priority is not None and row[_PRIORITY] != self._priority:
+            return False
+        return not self._keyword or self._keyword in row[_TITLE].lower()
+
+    def _refilter(self):
+        if self._module is None and self._priority is None and not self._keyword:
+            self._visible = list(range(len(self._rows)))
+        else:
+            self._visible = [index for index, row in enumerate(self._rows) if self._accepts(row)]
+        self._sortVisible()
+
+    def _sortVisible(self):
+        if self._sort_column is None:
+            return
+        column = self._sort_column
+        rows = self._rows
+        self._visible.sort(key=lambda index: rows[index][column], reverse=self._sort_order == Qt.DescendingOrder)
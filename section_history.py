@@ -0,0 +1,131 @@
+"""需求章节生成历史（增量生成）
+
+按标题把需求切分为章节，记录每组章节的内容哈希及为其生成的用例。再次生成时，
+与历史记录逐章节比对：未变化的章节组直接复用已有用例，只有修改过或新增的章节
+重新调用API。历史按 (Base URL、服务、模型、提示词) 分别保存，任一项变化都会全部重新生成。
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from json_store import load_json, save_json
+from requirement_splitter import estimate_tokens, split_sections
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".ai_test_generator", "section_history")
+# 每个生成单元（若干相邻章节）的 token 预算，默认约为一个章节；越小则修改一段需求时
+# 需要重新生成的内容越少，但首次生成的调用次数越多
+DEFAULT_UNIT_TOKENS = 1000
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def section_hash(text):
+    """章节内容哈希，忽略首尾空白"""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def scope_key(base_url, service_type, model, system_prompt, user_prompt):
+    """生成上下文的哈希，同一上下文下的章节历史才可以复用"""
+    payload = json.dumps([base_url.rstrip("/"), service_type, model, system_prompt, user_prompt],
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationUnit:
+    """一次生成的最小单元：若干相邻章节，及其已有（复用）或待生成的用例"""
+
+    def __init__(self, hashes, text, cases=None):
+        self.hashes = hashes
+        self.text = text
+        self.cases = cases
+
+    @property
+    def reused(self):
+        return self.cases is not None
+
+
+def _pack_pending(sections, hashes, unit_tokens):
+    """把连续的待生成章节按 token 预算合并为生成单元"""
+    units = []
+    current_hashes, current_text, current_tokens = [], "", 0
+    for text, digest in zip(sections, hashes):
+        tokens = estimate_tokens(text)
+        if current_hashes and current_tokens + tokens > unit_tokens:
+            units.append(GenerationUnit(current_hashes, current_text))
+            current_hashes, current_text, current_tokens = [], "", 0
+        current_hashes.append(digest)
+        current_text += text
+        current_tokens += tokens
+    if current_hashes:
+        units.append(GenerationUnit(current_hashes, current_text))
+    return units
+
+
+class SectionHistory:
+    """一个生成上下文下的章节历史，保存在 directory/<scope>.json"""
+
+    def __init__(self, scope, directory=DEFAULT_HISTORY_DIR, max_age_seconds=DEFAULT_MAX_AGE_DAYS * 86400):
+        self.path = os.path.join(directory, scope + ".json")
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._groups = load_json(self.path)
+
+    @staticmethod
+    def _group_key(hashes):
+        return ",".join(hashes)
+
+    def plan(self, requirements, unit_tokens=DEFAULT_UNIT_TOKENS, reuse=True, sections=None):
+        """将需求切分为生成单元，能与历史完全匹配的章节组带上已有用例
+
+        reuse 为 False 时不读取历史（强制重新生成），但仍按相同方式切分以便写回。
+        sections 为已切分好的章节时直接使用，不再切分 requirements。
+        """
+        if sections is None:
+            sections = split_sections(requirements)
+        sections = [section for section in sections if section.strip()]
+        hashes = [section_hash(section) for section in sections]
+
+        # 以首个章节哈希索引历史中的章节组，同一起点优先匹配最长的组
+        by_first = {}
+        if reuse:
+            for key, group in self._groups.items():
+                by_first.setdefault(group["sections"][0], []).append(group)
+            for groups in by_first.values():
+                groups.sort(key=lambda group: len(group["sections"]), reverse=True)
+
+        units = []
+        pending_start = 0
+        i = 0
+        while i < len(sections):
+            match = None
+            for group in by_first.get(hashes[i], ()):
+                length = len(group["sections"])
+                if hashes[i:i + length] == group["sections"]:
+                    match = group
+                    break
+            if match is None:
+                i += 1
+                continue
+            units.extend(_pack_pending(sections[pending_start:i], hashes[pending_start:i], unit_tokens))
+            length = len(match["sections"])
+            units.append(GenerationUnit(match["sections"], "".join(sections[i:i + length]), match["cases"]))
+            i += length
+            pending_start = i
+        units.extend(_pack_pending(sections[pending_start:], hashes[pending_start:], unit_tokens))
+        return units
+
+    def update(self, units):
+        """记录本次生成的单元（cases 为 None 的失败单元不记录），删除过期的章节组并写回磁盘"""
+        now = time.time()
+        with self._lock:
+            for unit in units:
+                if unit.cases:
+                    self._groups[self._group_key(unit.hashes)] = {
+                        "sections": unit.hashes, "cases": unit.cases, "used": now}
+            self._groups = {key: group for key, group in self._groups.items()
+                            if now - group.get("used", 0) <= self.max_age_seconds}
+            self._save()
+
+    def _save(self):
+        save_json(self.path, self._groups, "需求章节历史")
@@ -0,0 +1,263 @@
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack
+
+from json_stream_parser import IncrementalJSONArrayParser
+from rate_limit import call_with_retry_async
+from requirement_splitter import estimate_tokens
+from generation_engine import default_engine
+
+# 错误提示中保留的原始响应长度
+RESPONSE_PREVIEW_CHARS = 1000
+
+
+class GenerationError(Exception):
+    """单次生成失败，异常信息即为展示给用户的错误描述"""
+
+
+class StreamAttempt:
+    """一次流式 chat.completions 调用
+
+    调用以协程形式在生成引擎（generation_engine）的事件循环中执行，边接收边增量解析用例；
+    start() 立即返回，run() 等待调用结束。状态可被其他线程读取，并支持从其他线程 cancel()，
+    用于取消生成或在对冲请求时中止较慢的一路。client 为 client_pool 中的异步客户端。
+
+    每次建立连接前先向 limiter 申请配额，再占用引擎的一个全局并发名额（满额时排队）；
+    名额只覆盖建立连接与接收数据，限速排队与重试退避期间不占用名额，不会挡住其他服务商的调用。
+    建立失败时按 retry_config 重试；流开始后不再重试，以免重复发出已解析的用例。
+    """
+
+    def __init__(self, client, api_params, on_case=None, label="", limiter=None, retry_config=None,
+                 on_progress=None, metrics=None, engine=None):
+        self.client = client
+        self.api_params = api_params
+        self.label = label or api_params.get("model", "")
+        self.limiter = limiter
+        self.retry_config = retry_config
+        self.on_progress = on_progress
+        self.metrics = metrics  # telemetry.RunMetrics，多路调用共享
+        self.engine = engine or default_engine()
+        self.output_tokens = 0
+        self.cases = []
+        self.preview = ""
+        self.skipped_count = 0
+        self.recovered_count = 0
+        self.ttft = None
+        self.duration = None
+        self.finish_reason = None
+        self.unterminated = False
+        self.error = None
+        self.cancelled = False
+        self.first_token = threading.Event()
+        self.done = threading.Event()
+        self._response = None
+        self._future = None
+        self._task = None
+        self._on_case = on_case
+        self._live_count = 0
+        self._watchers = []
+        self._lock = threading.Lock()
+
+    @property
+    def succeeded(self):
+        return self.done.is_set() and self.error is None and bool(self.cases)
+
+    @property
+    def tokens_per_second(self):
+        """首字之后的输出速度，没有输出时为 None"""
+        if self.ttft is None or self.duration is None or self.duration <= self.ttft or not self.output_tokens:
+            return None
+        return self.output_tokens / (self.duration - self.ttft)
+
+    @property
+    def truncated(self):
+        """输出因长度上限被截断：finish_reason 为 length，或未返回 finish_reason 且 JSON 数组没有闭合"""
+        if self.cancelled or self.error is not None:
+            return False
+        return self.finish_reason == "length" or (self.finish_reason is None and self.unterminated)
+
+    def start(self):
+        """在生成引擎中开始调用，不等待结束；重复调用无效"""
+        with self._lock:
+            if self._future is None:
+                self._future = self.engine.submit(self.run_async())
+            return self._future
+
+    def run(self):
+        """在生成引擎中执行调用并等待结束"""
+        self.start()
+        self.done.wait()
+
+    async def run_async(self):
+        self._task = asyncio.current_task()
+        started = time.monotonic()
+        try:
+            if self.cancelled:
+                return
+            async with AsyncExitStack() as slot:
+                self._response = await call_with_retry_async(lambda: self._create(slot), self.retry_config,
+                                                             on_retry=self._report_retry,
+                                                             should_abort=lambda: self.cancelled)
+                if self._response is None or self.cancelled:
+                    return
+
+                parser = IncrementalJSONArrayParser()
+                usage_tokens = None
+                async for chunk in self._response:
+                    if self.cancelled:
+                        break
+                    usage = getattr(chunk, 'usage', None)
+                    if usage is not None and getattr(usage, 'completion_tokens', None):
+                        usage_tokens = usage.completion_tokens
+                    if not hasattr(chunk, 'choices') or not chunk.choices:
+                        continue
+                    try:
+                        choice = chunk.choices[0]
+                        if getattr(choice, 'finish_reason', None):
+                            self.finish_reason = choice.finish_reason
+                        if hasattr(choice, 'delta') and choice.delta is not None:
+                            delta = choice.delta
+                            if hasattr(delta, 'content') and delta.content is not None:
+                                self._handle_content(delta.content, parser, started)
+                    except IndexError:
+                        continue
+                    except Exception as e:
+                        print(f"处理数据块时遇到意外错误: {e}")
+                        continue
+                if not self.cancelled:
+                    self._emit(parser.finish())
+                self.skipped_count = parser.skipped_count
+                self.recovered_count = parser.recovered_count
+                if self.skipped_count and self.on_progress:
+                    self.on_progress(f"{self.label} 输出中有 {self.skipped_count} 个用例对象损坏已跳过，"
+                                     f"恢复了 {self.recovered_count} 个受其影响的用例")
+                self.unterminated = parser.unterminated
+                if usage_tokens is not None:
+                    self.output_tokens = usage_tokens
+        except asyncio.CancelledError:
+            # 由 cancel() 取消，已解析的用例保留
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self.error = e
+        finally:
+            await self._close()
+            self.duration = time.monotonic() - started
+            if self.limiter is not None:
+                self.limiter.record_tokens(self.output_tokens)
+            self.done.set()
+            self._notify_watchers()
+
+    async def _create(self, slot):
+        """申请限速配额后占用并发名额并建立连接；成功时名额转交给 slot，直到流结束才释放，
+        失败时立即释放，重试前的等待不占用名额"""
+        if self.limiter is not None:
+            prompt_tokens = sum(estimate_tokens(message["content"]) for message in self.api_params["messages"])
+            waited = await self.limiter.acquire_async(prompt_tokens, should_abort=lambda: self.cancelled)
+            if waited >= 1 and self.on_progress:
+                self.on_progress(f"{self.label} 已按限速配置排队 {waited:.1f} 秒")
+        if self.cancelled:
+            return None
+        attempt_slot = AsyncExitStack()
+        await attempt_slot.enter_async_context(self.engine.stream_slot(on_wait=self._report_queued))
+        try:
+            response = None if self.cancelled else await self.client.chat.completions.create(**self.api_params)
+        except BaseException:
+            await attempt_slot.aclose()
+            raise
+        slot.push_async_exit(attempt_slot)
+        return response
+
+    def _report_queued(self):
+        if self.on_progress:
+            self.on_progress(f"{self.label} 正在等待并发名额（全局最多 {self.engine.max_concurrent_streams} 路）...")
+
+    def _report_retry(self, attempt, delay, error):
+        status = getattr(error, "status_code", None)
+        reason = f"HTTP {status}" if status else type(error).__name__
+        message = f"{self.label} 请求失败（{reason}），{delay:.1f} 秒后进行第 {attempt} 次重试..."
+        if self.on_progress:
+            self.on_progress(message)
+        else:
+            print(message)
+
+    def _handle_content(self, content_piece, parser, started):
+        if self.ttft is None:
+            self.ttft = time.monotonic() - started
+            self.first_token.set()
+            self._notify_watchers()
+        tokens = estimate_tokens(content_piece)
+        self.output_tokens += tokens
+        if self.metrics is not None:
+            self.metrics.record_content(content_piece, tokens)
+        if len(self.preview) < RESPONSE_PREVIEW_CHARS:
+            self.preview += content_piece[:RESPONSE_PREVIEW_CHARS - len(self.preview)]
+        self._emit(parser.feed(content_piece))
+
+    def _emit(self, cases):
+        for case in cases:
+            with self._lock:
+                self.cases.append(case)
+                on_case = self._on_case
+                if on_case is not None:
+                    self._live_count += 1
+            if on_case is not None:
+                on_case(case)
+
+    def watch(self, event):
+        """收到首字或调用结束时 set() 给定的 threading.Event，用于在一个线程中同时等待多路调用"""
+        with self._lock:
+            self._watchers.append(event)
+            notify = self.first_token.is_set() or self.done.is_set()
+        if notify:
+            event.set()
+
+    def _notify_watchers(self):
+        with self._lock:
+            watchers = list(self._watchers)
+        for event in watchers:
+            event.set()
+
+    def detach(self):
+        """停止实时回调，返回此前已经实时发出的用例数"""
+        with self._lock:
+            self._on_case = None
+            return self._live_count
+
+    def cancel(self):
+        """中止本次调用：取消引擎中的协程，正在进行的流随之关闭并释放连接"""
+        self.cancelled = True
+        task = self._task
+        if task is not None and not self.done.is_set():
+            self.engine.call_soon(task.cancel)
+
+    async def _close(self):
+        response, self._response = self._response, None
+        if response is None:
+            return
+        try:
+            await response.close()
+        except Exception:
+            pass
+
+    def result(self):
+        """返回解析出的用例列表；调用失败或没有有效用例时抛出异常
+
+        已被取消的调用不抛出异常，返回取消前已完整解析的用例（可能为空）。
+        """
+        if self.cancelled:
+            return self.cases
+        if self.error is not None:
+            raise self.error
+        if not self.preview.strip():
+            raise GenerationError("API返回的响应内容为空，请检查您的请求参数和网络连接。")
+
+        print(f"原始响应预览: {self.preview[:500]}...")
+        if self.recovered_count:
+            print(f"从损坏的输出中恢复了 {self.recovered_count} 个用例")
+        if self.skipped_count:
+            print(f"有 {self.skipped_count} 个用例对象无法解析，已跳过")
+        if not self.cases:
+            raise GenerationError("无法从API响应中提取有效的JSON数据。响应内容为:\n" + self.preview)
+        return self.cases
@@ -0,0 +1,89 @@
+"""生成过程的实时指标
+
+RunMetrics 在流式接收循环中累计一次生成任务（含全部分块与对冲请求）的首字延迟、
+输出 token 数、接收字节数、已解析用例数，可随时从其他线程读取快照；
+任务结束后把最终指标追加到本地的指标日志（每行一个 JSON）。
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_METRICS_LOG = os.path.join(os.path.expanduser("~"), ".ai_test_generator", "metrics.jsonl")
+
+
+class RunMetrics:
+    """一次生成任务的指标，线程安全"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.ttft = None
+        self.tokens = 0
+        self.bytes = 0
+        self.cases = 0
+        self.last_data = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record_content(self, text, tokens):
+        """记录流中收到的一段内容"""
+        now = time.monotonic()
+        with self._lock:
+            if self.ttft is None:
+                self.ttft = now - self.started
+            self.tokens += tokens
+            self.bytes += len(text.encode("utf-8"))
+            self.last_data = now
+
+    def record_case(self):
+        with self._lock:
+            self.cases += 1
+
+    def finish(self):
+        with self._lock:
+            if self.finished is None:
+                self.finished = time.monotonic()
+
+    def snapshot(self):
+        """返回当前指标；tokens_per_second 按首字之后的时长计算，idle 为距最近一次收到数据的秒数"""
+        with self._lock:
+            now = self.finished or time.monotonic()
+            streaming = now - self.started - self.ttft if self.ttft is not None else 0
+            return {
+                "elapsed": round(now - self.started, 2),
+                "ttft": round(self.ttft, 2) if self.ttft is not None else None,
+                "tokens": self.tokens,
+                "tokens_per_second": round(self.tokens / streaming, 1) if streaming > 0 else 0.0,
+                "bytes": self.bytes,
+                "cases": self.cases,
+                "idle": round(now - self.last_data, 1) if self.last_data is not None else None,
+            }
+
+    def status_text(self):
+        """状态栏展示用的单行文字"""
+        stats = self.snapshot()
+        if stats["ttft"] is None:
+            return f"⏱ {stats['elapsed']:.0f}s | 等待首字..."
+        text = (f"⏱ {stats['elapsed']:.0f}s | 首字 {stats['ttft']:.1f}s | {stats['tokens_per_second']:.0f} tok/s | "
+                f"{stats['bytes'] / 1024:.1f} KB | 已解析 {stats['cases']} 个用例")
+        if stats["idle"] is not None and stats["idle"] >= 5:
+            text += f" | {stats['idle']:.0f}s 未收到数据"
+        return text
+
+
+def metrics_log_path(telemetry_config):
+    """根据 config.json 的 telemetry 节返回指标日志路径，关闭日志时返回 None"""
+    if not telemetry_config.get("log_enabled", True):
+        return None
+    return telemetry_config.get("metrics_log") or DEFAULT_METRICS_LOG
+
+
+def append_metrics_log(record, path=None):
+    """将一次任务的指标追加到指标日志；写入失败只打印提示"""
+    path = path or DEFAULT_METRICS_LOG
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"写入指标日志失败: {e}")
@@ -0,0 +1,119 @@
+"""输出 token 预算
+
+根据需求长度与系统提示词中要求的用例数量估算输出规模，为每次请求设置 max_tokens，
+并记录每个模型"估算值 / 实际用量"，用实际的"每条用例 token 数"修正后续估算。
+"""
+import math
+import os
+import re
+import threading
+
+from json_store import load_json, save_json
+from requirement_splitter import estimate_tokens
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".ai_test_generator", "token_usage.json")
+# 各模型/服务的 max_tokens 上限，可被 config.json 的 output_limits 节覆盖
+DEFAULT_OUTPUT_LIMITS = {
+    "default": 24576,
+    "腾讯混元": 32768,
+}
+MIN_OUTPUT_TOKENS = 2048
+# 没有历史数据时每条用例的 token 数、提示词未写明数量时的目标用例数
+DEFAULT_TOKENS_PER_CASE = 200
+DEFAULT_TARGET_CASES = 50
+# 需求拆分为多次请求时，每次请求要求的最少用例数下限
+MIN_CASES_PER_REQUEST = 5
+# 需求内容每多少 token 大约对应一条用例；长需求的用例数会超过提示词中的下限
+REQUIREMENT_TOKENS_PER_CASE = 40
+# 估算值的放大系数，留出余量避免截断
+SAFETY_FACTOR = 1.3
+# 历史数据的指数滑动平均权重
+HISTORY_WEIGHT = 0.3
+
+_TARGET_COUNT = re.compile(r'(?:不少于|至少|不低于|不得少于)\s*(\d+)\s*[条个]')
+
+
+def target_case_count(system_prompt):
+    """从系统提示词中读取要求的最少用例数，如"测试用例总数不少于50条" """
+    match = _TARGET_COUNT.search(system_prompt or "")
+    return int(match.group(1)) if match else DEFAULT_TARGET_CASES
+
+
+def scale_case_quota(system_prompt, share):
+    """需求拆分为多次请求时，按本次请求的需求占比 share 缩小系统提示词中要求的最少用例数
+
+    各部分的要求之和与整份需求一致，不会每个部分都要求完整的用例数；
+    结果不低于 MIN_CASES_PER_REQUEST。提示词未写明数量或 share >= 1 时原样返回。
+    """
+    match = _TARGET_COUNT.search(system_prompt or "")
+    if match is None or share >= 1:
+        return system_prompt
+    count = max(MIN_CASES_PER_REQUEST, math.ceil(int(match.group(1)) * share))
+    return system_prompt[:match.start(1)] + str(count) + system_prompt[match.end(1):]
+
+
+def output_limit(limits_config, service_type, model):
+    """返回模型允许的 max_tokens 上限：依次查找模型名、服务名、default"""
+    limits = dict(DEFAULT_OUTPUT_LIMITS)
+    limits.update(limits_config)
+    for key in (model, service_type):
+        if key in limits:
+            return int(limits[key])
+    return int(limits["default"])
+
+
+class TokenUsageHistory:
+    """按模型记录输出 token 用量，持久化为 JSON 文件"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._models = load_json(path)
+
+    def tokens_per_case(self, model):
+        with self._lock:
+            entry = self._models.get(model)
+        return entry["tokens_per_case"] if entry else DEFAULT_TOKENS_PER_CASE
+
+    def record(self, model, estimated, actual, cases):
+        """记录一次请求的估算值、实际输出 token 数与用例数"""
+        if not actual or not cases:
+            return
+        observed = actual / cases
+        with self._lock:
+            entry = self._models.get(model)
+            if entry is None:
+                entry = {"tokens_per_case": observed, "runs": 0}
+            else:
+                entry["tokens_per_case"] += HISTORY_WEIGHT * (observed - entry["tokens_per_case"])
+            entry["runs"] += 1
+            entry["last_estimate"] = estimated
+            entry["last_actual"] = actual
+            entry["last_cases"] = cases
+            self._models[model] = entry
+            self._save()
+
+    def _save(self):
+        save_json(self.path, self._models, " token 用量记录", indent=2)
+
+
+_default_history = None
+_default_history_lock = threading.Lock()
+
+
+def default_history():
+    """进程内共享的用量记录，首次使用时加载"""
+    global _default_history
+    with _default_history_lock:
+        if _default_history is None:
+            _default_history = TokenUsageHistory()
+        return _default_history
+
+
+def estimate_max_tokens(requirements, system_prompt, model, limit, history=None):
+    """估算一次请求所需的 max_tokens，结果限制在 [MIN_OUTPUT_TOKENS, limit] 之间"""
+    history = history or default_history()
+    expected_cases = max(target_case_count(system_prompt),
+                         estimate_tokens(requirements) // REQUIREMENT_TOKENS_PER_CASE)
+    estimate = int(expected_cases * history.tokens_per_case(model) * SAFETY_FACTOR)
+    return max(min(MIN_OUTPUT_TOKENS, limit), min(estimate, limit))